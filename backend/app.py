@@ -1,15 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from database import engine
 from models import user_model
 from models import (
     journal_model,
+    journal_term_model,
+    mood_pattern_cache_model,
     medication_model,
     medication_log_model,
+    medication_adherence_model,
     fitness_log_model,
+    intraday_activity_model,
     circle_model,
     circle_member_model,
-    message_model
+    message_model,
+    inbox_counter_model,
+    circle_leaderboard_cache_model,
+    circle_weekly_stats_model,
+    export_job_model
 )
 from routes import auth_routes
 from routes import journal_routes
@@ -20,11 +29,22 @@ from routes import insights_routes
 from routes import user_routes
 from routes import stats_routes
 from routes import export_routes
+from routes import calendar_routes
+from routes import activity_routes
+from routes import inbox_routes
+from utils.security import shutdown_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # uvicorn exits without running atexit hooks, which would orphan the hashing processes
+    shutdown_pool()
 
 app = FastAPI(
     title="MindMesh API",
     description="AI-Powered Behavioral Health & Habit Reinforcement Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware - allow frontend to connect
@@ -34,6 +54,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 user_model.Base.metadata.create_all(bind=engine)
@@ -47,6 +68,9 @@ app.include_router(insights_routes.router, prefix="/api")
 app.include_router(user_routes.router, prefix="/api")
 app.include_router(stats_routes.router, prefix="/api")
 app.include_router(export_routes.router, prefix="/api")
+app.include_router(calendar_routes.router, prefix="/api")
+app.include_router(activity_routes.router, prefix="/api")
+app.include_router(inbox_routes.router, prefix="/api")
 
 @app.get("/")
 def root():
@@ -6,4 +6,11 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+JOURNAL_COMPRESSION = os.getenv("JOURNAL_COMPRESSION", "false").lower() in ("1", "true", "yes")
+JOURNAL_COMPRESS_MIN_BYTES = int(os.getenv("JOURNAL_COMPRESS_MIN_BYTES", "1024"))
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+CIRCLE_ACCESS_TTL_SECONDS = float(os.getenv("CIRCLE_ACCESS_TTL_SECONDS", "0"))
+IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "30"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", str(max(0, 10 - PASSWORD_HASH_WORKERS))))
\ No newline at end of file
@@ -1,15 +1,18 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from models.user_model import User
-from schemas.user_schema import UserCreate, UserLogin, TokenResponse
+from schemas.user_schema import UserCreate, UserLogin, UserResponse, TokenResponse
 from utils.security import hash_password, verify_password, create_access_token
 def register_user(user: UserCreate, db: Session):
     existing_user = db.query(User).filter(User.email == user.email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
+    # End the transaction so no pooled connection is held while bcrypt runs
+    db.rollback()
+    password_hash = hash_password(user.password)
     new_user = User(
         email=user.email,
-        password=hash_password(user.password),
+        password=password_hash,
         name=user.name,
         age_range=user.age_range,
         primary_goal=user.primary_goal
@@ -24,10 +27,16 @@ def register_user(user: UserCreate, db: Session):
     )
 def login_user(user: UserLogin, db: Session):
     db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.password):
+    if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token({"sub": db_user.email, "user_id": db_user.id})
+    profile = UserResponse.model_validate(db_user)
+    password_hash = db_user.password
+    # Return the connection to the pool before waiting on bcrypt
+    db.close()
+    if not verify_password(user.password, password_hash):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    token = create_access_token({"sub": profile.email, "user_id": profile.id})
     return TokenResponse(
         token=token,
-        user=db_user
+        user=profile
     )
\ No newline at end of file
@@ -8,8 +8,8 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from models.journal_model import JournalEntry
 from models.fitness_log_model import FitnessLog
-from models.medication_log_model import MedicationLog
 from models.medication_model import Medication
+from utils.adherence import load_adherence, daily_taken_counts
 from datetime import datetime, timedelta
 
 
@@ -110,9 +110,10 @@ def get_fitness_data(user_id: int, db: Session, days: int = 7) -> list:
 
 def get_medication_adherence_data(user_id: int, db: Session, days: int = 7) -> list:
     """Get daily medication adherence for the past N days"""
-    start_date = datetime.utcnow().date() - timedelta(days=days)
+    today = datetime.utcnow().date()
+    start_date = today - timedelta(days=days)
     
-    medications = db.query(Medication).filter(
+    medications = db.query(Medication.id, Medication.frequency_per_day).filter(
         Medication.user_id == user_id
     ).all()
     
@@ -122,27 +123,15 @@ def get_medication_adherence_data(user_id: int, db: Session, days: int = 7) -> l
     med_ids = [m.id for m in medications]
     total_freq = sum(m.frequency_per_day for m in medications)
     
-    logs = db.query(MedicationLog).filter(
-        MedicationLog.medication_id.in_(med_ids),
-        MedicationLog.taken_date >= start_date,
-        MedicationLog.taken == True
-    ).all()
-    
-    adherence_by_date = {}
-    for log in logs:
-        date_key = log.taken_date
-        if date_key not in adherence_by_date:
-            adherence_by_date[date_key] = 0
-        adherence_by_date[date_key] += 1
+    # Medications taken per day, oldest first, read from adherence bitmaps
+    bitmaps = load_adherence(db, med_ids, start_date, today)
+    taken_by_day = daily_taken_counts(bitmaps, days + 1)
     
     # Calculate adherence as percentage (0 to 1)
     adherence_data = []
     for i in range(days + 1):
-        date_key = (datetime.utcnow().date() - timedelta(days=i))
-        if date_key in adherence_by_date:
-            adherence = min(1.0, adherence_by_date[date_key] / total_freq)
-        else:
-            adherence = 0.0
+        date_key = today - timedelta(days=i)
+        adherence = min(1.0, taken_by_day[days - i] / total_freq) if total_freq > 0 else 0.0
         adherence_data.append({
             "date": date_key,
             "adherence": adherence
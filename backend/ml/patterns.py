@@ -0,0 +1,163 @@
+"""
+Mood Pattern Module
+Bucket journal sentiment by weekday and hour of day
+"""
+
+import json
+from sqlalchemy import func, extract, literal_column
+from sqlalchemy.orm import Session
+from models.journal_model import JournalEntry
+from models.mood_pattern_cache_model import MoodPatternCache
+from utils.bulk import upsert_rows
+from utils.sql import weekday_of
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Totals are kept per quarter hour, the granularity of every real UTC offset
+SLOT_MINUTES = 15
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+CELLS = 7 * 24 * SLOTS_PER_HOUR
+
+# A slot needs this many entries before it can be reported as the lowest
+MIN_ENTRIES_FOR_LOWEST = 3
+
+
+def _empty_cells() -> list:
+    return [[0, 0.0] for _ in range(CELLS)]
+
+
+def _cell_index(weekday: int, hour: int, minute: int) -> int:
+    return (weekday * 24 + hour) * SLOTS_PER_HOUR + minute // SLOT_MINUTES
+
+
+def _aggregate_cells(db: Session, user_id: int) -> list:
+    """[count, sentiment_sum] per UTC quarter-hour slot of the week over all the user's entries"""
+    cells = _empty_cells()
+    scored = (
+        JournalEntry.user_id == user_id,
+        JournalEntry.sentiment_score.isnot(None)
+    )
+    weekday = weekday_of(JournalEntry.created_at, db.get_bind().dialect.name)
+    if weekday is not None:
+        hour = extract("hour", JournalEntry.created_at).label("hour")
+        minute = extract("minute", JournalEntry.created_at).label("minute")
+        totals = db.query(
+            weekday.label("weekday"), hour, minute,
+            func.count(JournalEntry.id),
+            func.sum(JournalEntry.sentiment_score)
+        ).filter(*scored).group_by(
+            literal_column("weekday"), literal_column("hour"), literal_column("minute")
+        ).all()
+    else:
+        # No weekday function on this database: bucket in Python
+        totals = [
+            (created_at.weekday(), created_at.hour, created_at.minute, 1, score)
+            for created_at, score in db.query(JournalEntry.created_at, JournalEntry.sentiment_score).filter(*scored)
+        ]
+
+    for day, hour_of_day, minute_of_hour, count, total in totals:
+        cell = cells[_cell_index(int(day), int(hour_of_day), int(minute_of_hour))]
+        cell[0] += count
+        cell[1] += float(total)
+    return cells
+
+
+def _load_cells(db: Session, user_id: int) -> list:
+    """
+    Return [count, sentiment_sum] per UTC quarter-hour slot of the week.
+
+    Reads the totals cached by record_mood_entry, or aggregates them on the
+    fly when there is no cache yet (or it predates quarter-hour slots).
+    Never writes, so reading insights doesn't contend with journal writes.
+    """
+    cache = db.query(MoodPatternCache).filter(MoodPatternCache.user_id == user_id).first()
+    if cache is not None:
+        cells = json.loads(cache.cells)
+        if len(cells) == CELLS:
+            return cells
+    return _aggregate_cells(db, user_id)
+
+
+def record_mood_entry(db: Session, entry: JournalEntry):
+    """
+    Add a newly flushed journal entry to the user's cached totals. The
+    cache row is created (empty) first and then locked, so concurrent
+    entries are added one at a time. A new row is filled from every
+    visible entry, including this one; entries of transactions still
+    in flight are added by those transactions once they get the lock.
+    The caller commits.
+    """
+    upsert_rows(
+        db, MoodPatternCache,
+        [{"user_id": entry.user_id, "last_entry_id": 0, "cells": json.dumps(_empty_cells())}],
+        index_elements=["user_id"],
+        update_columns=[]
+    )
+    cache = db.query(MoodPatternCache).filter(
+        MoodPatternCache.user_id == entry.user_id
+    ).with_for_update().populate_existing().one()
+
+    cells = json.loads(cache.cells)
+    if cache.last_entry_id == 0 or len(cells) != CELLS:
+        cells = _aggregate_cells(db, entry.user_id)
+    elif entry.sentiment_score is not None:
+        created_at = entry.created_at
+        cell = cells[_cell_index(created_at.weekday(), created_at.hour, created_at.minute)]
+        cell[0] += 1
+        cell[1] += float(entry.sentiment_score)
+
+    cache.cells = json.dumps(cells)
+    cache.last_entry_id = max(cache.last_entry_id, entry.id)
+
+
+def invalidate_mood_patterns(db: Session, user_id: int):
+    """
+    Drop the cached totals after an entry is edited or deleted, or entries
+    are written without record_mood_entry. The next new entry rebuilds
+    them. The caller commits.
+    """
+    db.query(MoodPatternCache).filter(MoodPatternCache.user_id == user_id).delete()
+
+
+def format_utc_offset(minutes: int) -> str:
+    sign = "-" if minutes < 0 else "+"
+    return f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+
+
+def get_mood_patterns(user_id: int, db: Session, utc_offset_minutes: int = 0) -> dict:
+    """
+    Build the 7x24 weekday/hour matrix of entry counts and average mood,
+    shifted from UTC to the caller's offset (a multiple of 15 minutes).
+    """
+    cells = _load_cells(db, user_id)
+
+    # Shifting the week-long slot ring moves entries across midnight and weekdays
+    shift = (utc_offset_minutes // SLOT_MINUTES) % CELLS
+    slots = cells[-shift:] + cells[:-shift] if shift else cells
+    local = []
+    for start in range(0, CELLS, SLOTS_PER_HOUR):
+        hour_slots = slots[start:start + SLOTS_PER_HOUR]
+        local.append([sum(c[0] for c in hour_slots), sum(c[1] for c in hour_slots)])
+
+    counts = [[local[d * 24 + h][0] for h in range(24)] for d in range(7)]
+    averages = [
+        [
+            round(local[d * 24 + h][1] / local[d * 24 + h][0], 3) if local[d * 24 + h][0] else None
+            for h in range(24)
+        ]
+        for d in range(7)
+    ]
+
+    lowest = None
+    for d in range(7):
+        for h in range(24):
+            if counts[d][h] >= MIN_ENTRIES_FOR_LOWEST and (lowest is None or averages[d][h] < lowest["avg_mood"]):
+                lowest = {"weekday": WEEKDAYS[d], "hour": h, "avg_mood": averages[d][h]}
+
+    return {
+        "utc_offset": format_utc_offset(utc_offset_minutes),
+        "weekdays": WEEKDAYS,
+        "total": sum(cell[0] for cell in cells),
+        "counts": counts,
+        "averages": averages,
+        "lowest": lowest
+    }
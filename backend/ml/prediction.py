@@ -7,8 +7,8 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from models.journal_model import JournalEntry
 from models.fitness_log_model import FitnessLog
-from models.medication_log_model import MedicationLog
 from models.medication_model import Medication
+from utils.adherence import load_adherence, daily_taken_counts
 from datetime import datetime, timedelta
 from .correlation import get_mood_data, calculate_mean
 
@@ -112,34 +112,26 @@ def get_fitness_data_simple(user_id: int, db: Session, days: int = 7) -> list:
 
 def get_medication_adherence_simple(user_id: int, db: Session, days: int = 7) -> list:
     """Get simplified medication adherence by date"""
-    start_date = datetime.utcnow().date() - timedelta(days=days)
+    today = datetime.utcnow().date()
+    start_date = today - timedelta(days=days)
     
-    medications = db.query(Medication).filter(
+    medications = db.query(Medication.id, Medication.frequency_per_day).filter(
         Medication.user_id == user_id
     ).all()
     
     if not medications:
-        return [{"date": (datetime.utcnow().date() - timedelta(days=i)), "adherence": 0.0} for i in range(days)]
+        return [{"date": (today - timedelta(days=i)), "adherence": 0.0} for i in range(days)]
     
     med_ids = [m.id for m in medications]
     total_freq = sum(m.frequency_per_day for m in medications)
     
-    logs = db.query(MedicationLog).filter(
-        MedicationLog.medication_id.in_(med_ids),
-        MedicationLog.taken_date >= start_date,
-        MedicationLog.taken == True
-    ).all()
-    
-    taken_by_date = {}
-    for log in logs:
-        if log.taken_date not in taken_by_date:
-            taken_by_date[log.taken_date] = 0
-        taken_by_date[log.taken_date] += 1
+    bitmaps = load_adherence(db, med_ids, start_date, today)
+    taken_by_day = daily_taken_counts(bitmaps, days + 1)
     
     result = []
     for i in range(days + 1):
-        date_key = (datetime.utcnow().date() - timedelta(days=i))
-        adherence = taken_by_date.get(date_key, 0) / total_freq if total_freq > 0 else 0.0
+        date_key = today - timedelta(days=i)
+        adherence = taken_by_day[days - i] / total_freq if total_freq > 0 else 0.0
         result.append({"date": date_key, "adherence": adherence})
     
     return result
@@ -1,8 +1,16 @@
 from models.user_model import User, PrimaryGoal
 from models.journal_model import JournalEntry
+from models.journal_term_model import JournalTerm
+from models.mood_pattern_cache_model import MoodPatternCache
 from models.medication_model import Medication
 from models.medication_log_model import MedicationLog
+from models.medication_adherence_model import MedicationAdherence
 from models.fitness_log_model import FitnessLog, Intensity
+from models.intraday_activity_model import IntradayActivity
 from models.circle_model import SupportCircle
 from models.circle_member_model import CircleMember, Role
 from models.message_model import EncouragementMessage
+from models.inbox_counter_model import InboxCounter
+from models.circle_leaderboard_cache_model import CircleLeaderboardCache
+from models.circle_weekly_stats_model import CircleWeeklyStats
+from models.export_job_model import ExportJob, ExportStatus
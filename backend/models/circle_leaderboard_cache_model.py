@@ -0,0 +1,7 @@
+from sqlalchemy import Column, Integer, Date, Text, ForeignKey
+from database import Base
+class CircleLeaderboardCache(Base):
+    __tablename__ = "circle_leaderboard_cache"
+    circle_id = Column(Integer, ForeignKey("support_circles.id"), primary_key=True)
+    computed_on = Column(Date, nullable=False)  # streaks are relative to this day
+    members = Column(Text, nullable=False)  # JSON list of member stats
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey
+from datetime import datetime
+from database import Base
+class CircleWeeklyStats(Base):
+    __tablename__ = "circle_weekly_stats"
+    circle_id = Column(Integer, ForeignKey("support_circles.id"), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # Monday
+    member_count = Column(Integer, nullable=False, default=0)
+    mood_avg = Column(Float)  # -1.0 to 1.0; NULL when too few members shared
+    mood_members = Column(Integer, nullable=False, default=0)
+    adherence_pct = Column(Float)
+    adherence_members = Column(Integer, nullable=False, default=0)
+    active_days_avg = Column(Float)
+    activity_members = Column(Integer, nullable=False, default=0)
+    computed_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Enum as SQLEnum, ForeignKey
+from datetime import datetime
+from database import Base
+import enum
+class ExportStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(SQLEnum(ExportStatus), default=ExportStatus.PENDING, nullable=False)
+    progress = Column(Integer, default=0, nullable=False)  # percent of rows written
+    file_size = Column(BigInteger)
+    error = Column(String(255))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime)
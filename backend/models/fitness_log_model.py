@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, Date, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, Date, Enum as SQLEnum, ForeignKey, UniqueConstraint
 from database import Base
 import enum
 class Intensity(str, enum.Enum):
@@ -7,6 +7,9 @@ class Intensity(str, enum.Enum):
     HIGH = "HIGH"
 class FitnessLog(Base):
     __tablename__ = "fitness_logs"
+    __table_args__ = (
+        UniqueConstraint("user_id", "log_date", name="uq_fitness_logs_user_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     log_date = Column(Date, nullable=False)
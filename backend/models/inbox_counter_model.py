@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from database import Base
+class InboxCounter(Base):
+    __tablename__ = "inbox_counters"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    circle_id = Column(Integer, ForeignKey("support_circles.id"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+    last_read_id = Column(Integer, nullable=False, default=0)  # messages up to this id have been read
\ No newline at end of file
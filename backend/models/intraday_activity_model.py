@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, Date, LargeBinary, ForeignKey, UniqueConstraint
+from database import Base
+class IntradayActivity(Base):
+    __tablename__ = "intraday_activity"
+    __table_args__ = (
+        UniqueConstraint("user_id", "sample_date", name="uq_intraday_activity_user_date"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    sample_date = Column(Date, nullable=False)
+    steps = Column(LargeBinary(2880), nullable=False)  # 1440 little-endian uint16, one per minute
+    heart_rate = Column(LargeBinary(2880), nullable=False)  # 0 = no reading
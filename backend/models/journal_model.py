@@ -1,12 +1,32 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, DECIMAL, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, DECIMAL, ForeignKey, Index
+from sqlalchemy.orm import validates
 from datetime import datetime
 from database import Base
+from utils.compression import CompressedText
+
+EXCERPT_LENGTH = 160
+
+def _default_excerpt(context):
+    # Core and bulk inserts bypass @validates
+    content = context.get_current_parameters().get("content")
+    return content[:EXCERPT_LENGTH + 1] if content is not None else None
+
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
+    __table_args__ = (
+        Index("ix_journal_entries_user_created", "user_id", "created_at"),
+        Index("ix_journal_entries_user_emotion", "user_id", "emotion_label"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    content = Column(Text, nullable=False)
+    content = Column(CompressedText, nullable=False)
+    excerpt = Column(String(EXCERPT_LENGTH + 1), default=_default_excerpt)  # one extra character marks truncation
     sentiment_score = Column(DECIMAL(4,3))  # -1.0 to 1.0
     emotion_label = Column(String(50))
     risk_flag = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @validates("content")
+    def _update_excerpt(self, key, content):
+        self.excerpt = content[:EXCERPT_LENGTH + 1]
+        return content
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from database import Base
+class JournalTerm(Base):
+    __tablename__ = "journal_terms"
+    __table_args__ = (
+        Index("ix_journal_terms_user_term", "user_id", "term"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    entry_id = Column(Integer, ForeignKey("journal_entries.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    term = Column(String(64), nullable=False)
+    frequency = Column(Integer, nullable=False, default=1)
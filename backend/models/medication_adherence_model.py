@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey, UniqueConstraint
+from database import Base
+class MedicationAdherence(Base):
+    __tablename__ = "medication_adherence"
+    __table_args__ = (
+        UniqueConstraint("medication_id", "year", name="uq_medication_adherence_medication_year"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    medication_id = Column(Integer, ForeignKey("medications.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    days = Column(LargeBinary(46), nullable=False)  # bit N = taken on day-of-year N+1
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Boolean, Date, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, Date, ForeignKey, UniqueConstraint
 from database import Base
 class MedicationLog(Base):
     __tablename__ = "medication_logs"
+    __table_args__ = (
+        UniqueConstraint("medication_id", "taken_date", name="uq_medication_logs_medication_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     medication_id = Column(Integer, ForeignKey("medications.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     taken_date = Column(Date, nullable=False)
-    taken = Column(Boolean, default=False)
\ No newline at end of file
+    taken = Column(Boolean, default=False)
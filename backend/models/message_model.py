@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from datetime import datetime
 from database import Base
 class EncouragementMessage(Base):
     __tablename__ = "encouragement_messages"
+    __table_args__ = (
+        Index("ix_encouragement_messages_circle_created", "circle_id", "created_at", "id"),
+        Index("ix_encouragement_messages_receiver_created", "receiver_id", "created_at", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     circle_id = Column(Integer, ForeignKey("support_circles.id"), nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
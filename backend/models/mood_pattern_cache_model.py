@@ -0,0 +1,7 @@
+from sqlalchemy import Column, Integer, Text, ForeignKey
+from database import Base
+class MoodPatternCache(Base):
+    __tablename__ = "mood_pattern_cache"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_entry_id = Column(Integer, nullable=False, default=0)  # highest entry counted; 0 until first filled
+    cells = Column(Text, nullable=False)  # JSON [count, sentiment_sum] per UTC quarter hour of the week
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum
 from datetime import datetime
 from database import Base
 import enum
@@ -15,4 +15,8 @@ class User(Base):
     name = Column(String(100))
     age_range = Column(String(20))
     primary_goal = Column(SQLEnum(PrimaryGoal), default=PrimaryGoal.MOOD)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Whether the user's data counts towards their circles' weekly wellness averages
+    share_mood = Column(Boolean, nullable=False, default=True)
+    share_adherence = Column(Boolean, nullable=False, default=True)
+    share_activity = Column(Boolean, nullable=False, default=True)
\ No newline at end of file
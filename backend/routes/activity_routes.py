@@ -0,0 +1,169 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import get_db
+from utils.auth import Identity, get_current_user
+from utils.bulk import upsert_rows
+from utils.intraday import unpack, pack, daily_totals, MINUTES_PER_DAY
+from utils.leaderboard import invalidate_member_leaderboards
+from models.intraday_activity_model import IntradayActivity
+from models.fitness_log_model import FitnessLog, Intensity
+from schemas.activity_schema import (
+    ActivitySamplesCreate, ActivityIngestResponse, ActivitySeriesResponse
+)
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+router = APIRouter(prefix="/activity", tags=["Activity"])
+
+MAX_SERIES_DAYS = 7
+# Distinct UTC days one ingest request may touch
+MAX_INGEST_DAYS = 14
+
+def _to_utc_minute(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(second=0, microsecond=0)
+
+def _sync_fitness_logs(db: Session, user_id: int, totals: dict):
+    """
+    Write derived daily totals into the user's FitnessLog for each day.
+    Pass only days the ingested batch had step samples for, so heart-rate
+    data never touches a log's steps, minutes or intensity.
+    """
+    logs = db.query(FitnessLog).filter(
+        FitnessLog.user_id == user_id,
+        FitnessLog.log_date.in_(totals.keys())
+    ).order_by(FitnessLog.id).all()
+    
+    logs_by_date = {}
+    for log in logs:
+        logs_by_date.setdefault(log.log_date, log)
+    
+    new_logs = []
+    for day, derived in totals.items():
+        log = logs_by_date.get(day)
+        if log is None:
+            if not derived["steps"]:
+                continue
+            new_logs.append({
+                "user_id": user_id,
+                "log_date": day,
+                "activity_completed": derived["activity_completed"],
+                "steps": derived["steps"],
+                "minutes_exercised": derived["minutes_exercised"],
+                "intensity": Intensity[derived["intensity"]]
+            })
+            continue
+        log.steps = derived["steps"]
+        log.minutes_exercised = derived["minutes_exercised"]
+        log.activity_completed = log.activity_completed or derived["activity_completed"]
+        log.intensity = Intensity[derived["intensity"]]
+    
+    upsert_rows(
+        db, FitnessLog, new_logs,
+        index_elements=["user_id", "log_date"],
+        update_columns=[]
+    )
+
+@router.post("/samples", response_model=ActivityIngestResponse)
+def ingest_activity_samples(
+    data: ActivitySamplesCreate,
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    samples_by_day = {}
+    for sample in data.samples:
+        timestamp = _to_utc_minute(sample.timestamp)
+        minute = timestamp.hour * 60 + timestamp.minute
+        samples_by_day.setdefault(timestamp.date(), []).append((minute, sample))
+    
+    if len(samples_by_day) > MAX_INGEST_DAYS:
+        raise HTTPException(status_code=400, detail=f"Samples cannot span more than {MAX_INGEST_DAYS} days")
+    
+    # Create missing day rows before locking, so concurrent first ingests
+    # for a day serialize on the row lock and merge instead of overwriting
+    empty = pack([0] * MINUTES_PER_DAY)
+    upsert_rows(
+        db, IntradayActivity,
+        [
+            {"user_id": current_user.id, "sample_date": day, "steps": empty, "heart_rate": empty}
+            for day in samples_by_day
+        ],
+        index_elements=["user_id", "sample_date"],
+        update_columns=[]
+    )
+    rows = {
+        row.sample_date: row for row in db.query(IntradayActivity).filter(
+            IntradayActivity.user_id == current_user.id,
+            IntradayActivity.sample_date.in_(samples_by_day.keys())
+        ).with_for_update().populate_existing()
+    }
+    
+    totals = {}  # only days with step samples
+    for day, samples in samples_by_day.items():
+        row = rows[day]
+        steps = unpack(row.steps)
+        heart_rate = unpack(row.heart_rate)
+        
+        # Re-sent samples overwrite the minute rather than accumulate
+        for minute, sample in samples:
+            if sample.steps is not None:
+                steps[minute] = sample.steps
+            if sample.heart_rate is not None:
+                heart_rate[minute] = sample.heart_rate
+        
+        row.steps = pack(steps)
+        row.heart_rate = pack(heart_rate)
+        if any(sample.steps is not None for _, sample in samples):
+            totals[day] = daily_totals(steps)
+    
+    _sync_fitness_logs(db, current_user.id, totals)
+    invalidate_member_leaderboards(db, current_user.id)
+    db.commit()
+    
+    return ActivityIngestResponse(accepted=len(data.samples), days=len(rows))
+
+@router.get("/samples", response_model=ActivitySeriesResponse)
+def get_activity_samples(
+    start: datetime,
+    end: Optional[datetime] = Query(None, description="Exclusive (default: start + 1 day)"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    start = _to_utc_minute(start)
+    end = _to_utc_minute(end) if end else start + timedelta(days=1)
+    
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > timedelta(days=MAX_SERIES_DAYS):
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_SERIES_DAYS} days")
+    
+    last = end - timedelta(minutes=1)
+    rows = {
+        row.sample_date: row for row in db.query(IntradayActivity).filter(
+            IntradayActivity.user_id == current_user.id,
+            IntradayActivity.sample_date >= start.date(),
+            IntradayActivity.sample_date <= last.date()
+        )
+    }
+    
+    steps = []
+    heart_rate = []
+    day = start.date()
+    while day <= last.date():
+        first_minute = start.hour * 60 + start.minute if day == start.date() else 0
+        end_minute = last.hour * 60 + last.minute + 1 if day == last.date() else MINUTES_PER_DAY
+        row = rows.get(day)
+        if row:
+            steps.extend(unpack(row.steps, first_minute, end_minute))
+            heart_rate.extend(bpm or None for bpm in unpack(row.heart_rate, first_minute, end_minute))
+        else:
+            steps.extend([0] * (end_minute - first_minute))
+            heart_rate.extend([None] * (end_minute - first_minute))
+        day += timedelta(days=1)
+    
+    return ActivitySeriesResponse(
+        start=start, end=end,
+        interval_seconds=60,
+        steps=steps, heart_rate=heart_rate
+    )
@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from database import get_db
+from utils.auth import Identity, get_current_user
+from utils.adherence import load_adherence, daily_taken_counts, day_index
+from utils.sql import as_date
+from models.journal_model import JournalEntry
+from models.medication_model import Medication
+from models.fitness_log_model import FitnessLog
+from schemas.calendar_schema import CalendarResponse
+from datetime import date, datetime
+import hashlib
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+@router.get("", response_model=CalendarResponse)
+def get_calendar(
+    request: Request,
+    year: int = Query(default=None, ge=1970, le=9999, description="Year (default: current year)"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    if year is None:
+        year = date.today().year
+    
+    start_date = date(year, 1, 1)
+    end_date = date(year, 12, 31)
+    days = day_index(end_date) + 1
+    
+    # Medication adherence: one bitmap read for the whole year
+    medications = db.query(Medication.id, Medication.frequency_per_day).filter(
+        Medication.user_id == current_user.id
+    ).all()
+    adherence = [None] * days
+    if medications:
+        total_freq = sum(m.frequency_per_day for m in medications)
+        bitmaps = load_adherence(db, [m.id for m in medications], start_date, end_date)
+        adherence = [
+            round(min(1.0, taken / total_freq), 3) if total_freq > 0 else 0.0
+            for taken in daily_taken_counts(bitmaps, days)
+        ]
+    
+    # Fitness: one row per logged day
+    active = [0] * days
+    steps = [0] * days
+    minutes = [0] * days
+    fitness_days = db.query(
+        FitnessLog.log_date,
+        func.max(case((FitnessLog.activity_completed == True, 1), else_=0)),
+        func.coalesce(func.sum(FitnessLog.steps), 0),
+        func.coalesce(func.sum(FitnessLog.minutes_exercised), 0)
+    ).filter(
+        FitnessLog.user_id == current_user.id,
+        FitnessLog.log_date >= start_date,
+        FitnessLog.log_date <= end_date
+    ).group_by(FitnessLog.log_date).all()
+    for log_date, completed, day_steps, day_minutes in fitness_days:
+        i = day_index(log_date)
+        active[i] = int(completed)
+        steps[i] = int(day_steps)
+        minutes[i] = int(day_minutes)
+    
+    # Mood: average sentiment per calendar day
+    mood = [None] * days
+    entry_day = func.date(JournalEntry.created_at)
+    mood_days = db.query(
+        entry_day,
+        func.avg(JournalEntry.sentiment_score)
+    ).filter(
+        JournalEntry.user_id == current_user.id,
+        JournalEntry.created_at >= datetime.combine(start_date, datetime.min.time()),
+        JournalEntry.created_at <= datetime.combine(end_date, datetime.max.time()),
+        JournalEntry.sentiment_score.isnot(None)
+    ).group_by(entry_day).all()
+    for day, avg_score in mood_days:
+        mood[day_index(as_date(day))] = round(float(avg_score), 3)
+    
+    payload = CalendarResponse(
+        year=year, days=days,
+        adherence=adherence, active=active,
+        steps=steps, minutes=minutes, mood=mood
+    ).model_dump_json()
+    
+    etag = '"' + hashlib.sha1(payload.encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=payload, media_type="application/json", headers=headers)
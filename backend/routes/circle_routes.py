@@ -1,25 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database import get_db
-from utils.auth import get_current_user
-from models.user_model import User
+from database import get_db, SessionLocal
+from utils.auth import Identity, get_current_user, get_stream_user
+from utils.pagination import keyset_page
+from utils.pubsub import get_broker
+from utils.inbox import count_new_message, mark_read
+from utils.leaderboard import get_leaderboard, invalidate_circle_leaderboard
+from utils.circle_access import (
+    CircleAccess, get_circle_access, get_member_access,
+    load_circle_access, require_circle_member, invalidate_circle_access
+)
 from models.circle_model import SupportCircle
 from models.circle_member_model import CircleMember, Role
 from models.message_model import EncouragementMessage
+from models.circle_weekly_stats_model import CircleWeeklyStats
 from schemas.circle_schema import (
     CircleCreate, CircleResponse, CircleWithMembers,
     CircleMemberResponse, MessageCreate, MessageResponse,
-    CircleUpdate
+    CircleUpdate, CircleLeaderboardResponse, CircleWellnessResponse
 )
-from typing import List
+from typing import List, Optional
+from datetime import date
+import json
+import time
+
+# Seconds between keep-alive comments on an idle event stream
+EVENT_KEEPALIVE_SECONDS = 15
+REPLAY_BATCH_SIZE = 100
+# Open event streams re-check membership this often, in case it changed on another worker
+MEMBERSHIP_RECHECK_SECONDS = 60
 
 router = APIRouter(prefix="/circles", tags=["Support Circles"])
 
+def circle_channel(circle_id: int) -> str:
+    return f"circle:{circle_id}"
+
 @router.post("", response_model=CircleResponse)
 def create_circle(
     circle: CircleCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     db_circle = SupportCircle(
         name=circle.name,
@@ -42,7 +64,7 @@ def create_circle(
 @router.get("", response_model=List[CircleResponse])
 def get_circles(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     circle_ids = db.query(CircleMember.circle_id).filter(
         CircleMember.user_id == current_user.id
@@ -51,62 +73,36 @@ def get_circles(
     return db.query(SupportCircle).filter(SupportCircle.id.in_(circle_ids)).all()
 
 @router.get("/{circle_id}", response_model=CircleResponse)
-def get_circle(
-    circle_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
-    
-    is_member = db.query(CircleMember).filter(
-        CircleMember.circle_id == circle_id,
-        CircleMember.user_id == current_user.id
-    ).first()
-    
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Not a member of this circle")
-    
-    return circle
+def get_circle(access: CircleAccess = Depends(get_member_access)):
+    return access
 
 @router.put("/{circle_id}", response_model=CircleResponse)
 def update_circle(
     circle_id: int,
     circle: CircleUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    access: CircleAccess = Depends(get_circle_access)
 ):
-    db_circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not db_circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
-    
-    if db_circle.created_by != current_user.id:
+    if not access.is_owner:
         raise HTTPException(status_code=403, detail="Only the owner can update the circle")
     
+    db_circle = db.get(SupportCircle, circle_id)
     if circle.name is not None:
         db_circle.name = circle.name
     
     db.commit()
     db.refresh(db_circle)
+    invalidate_circle_access(circle_id)
     return db_circle
 
 @router.post("/{circle_id}/join")
 def join_circle(
     circle_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user),
+    access: CircleAccess = Depends(get_circle_access)
 ):
-    circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
-    
-    existing = db.query(CircleMember).filter(
-        CircleMember.circle_id == circle_id,
-        CircleMember.user_id == current_user.id
-    ).first()
-    
-    if existing:
+    if access.is_member:
         return {"message": "Already a member"}
     
     member = CircleMember(
@@ -115,32 +111,34 @@ def join_circle(
         role=Role.MEMBER
     )
     db.add(member)
+    invalidate_circle_leaderboard(db, circle_id)
     db.commit()
+    invalidate_circle_access(circle_id, current_user.id)
     return {"message": "Joined successfully"}
 
 @router.post("/{circle_id}/leave")
 def leave_circle(
     circle_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user),
+    access: CircleAccess = Depends(get_circle_access)
 ):
-    circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
-    
-    membership = db.query(CircleMember).filter(
-        CircleMember.circle_id == circle_id,
-        CircleMember.user_id == current_user.id
-    ).first()
-    
-    if not membership:
+    if not access.is_member:
         raise HTTPException(status_code=404, detail="You are not a member of this circle")
     
-    if circle.created_by == current_user.id:
+    if access.is_owner:
         raise HTTPException(status_code=400, detail="Owner cannot leave the circle. Delete it instead.")
     
-    db.delete(membership)
+    db.query(CircleMember).filter(
+        CircleMember.circle_id == circle_id,
+        CircleMember.user_id == current_user.id
+    ).delete(synchronize_session=False)
+    # Clear the unread badge: former members can't mark the circle read any more
+    mark_read(db, current_user.id, circle_id)
+    invalidate_circle_leaderboard(db, circle_id)
     db.commit()
+    invalidate_circle_access(circle_id, current_user.id)
+    _publish_membership_change(circle_id, current_user.id)
     
     return {"message": "Left circle successfully"}
 
@@ -148,35 +146,59 @@ def leave_circle(
 def get_circle_members(
     circle_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    access: CircleAccess = Depends(get_member_access)
 ):
-    circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
-    
     members = db.query(CircleMember).filter(
         CircleMember.circle_id == circle_id
     ).all()
     
     return CircleWithMembers(
-        id=circle.id,
-        name=circle.name,
-        created_by=circle.created_by,
+        id=access.id,
+        name=access.name,
+        created_by=access.created_by,
         members=[CircleMemberResponse(id=m.id, user_id=m.user_id, role=m.role.value) for m in members]
     )
 
+@router.get("/{circle_id}/leaderboard", response_model=CircleLeaderboardResponse)
+def get_circle_leaderboard(
+    circle_id: int,
+    db: Session = Depends(get_db),
+    access: CircleAccess = Depends(get_member_access)
+):
+    """Members' medication and fitness streaks and this week's activity, best streaks first"""
+    today = date.today()
+    return CircleLeaderboardResponse(
+        circle_id=circle_id,
+        as_of=today,
+        members=get_leaderboard(db, circle_id, today)
+    )
+
+@router.get("/{circle_id}/wellness", response_model=CircleWellnessResponse)
+def get_circle_wellness(
+    circle_id: int,
+    weeks: int = Query(4, ge=1, le=52, description="Number of most recent computed weeks"),
+    db: Session = Depends(get_db),
+    access: CircleAccess = Depends(get_circle_access)
+):
+    """The circle's weekly average mood, adherence and active days, newest week first"""
+    if not access.is_owner:
+        raise HTTPException(status_code=403, detail="Only the owner can view circle wellness")
+    
+    stats = db.query(CircleWeeklyStats).filter(
+        CircleWeeklyStats.circle_id == circle_id
+    ).order_by(CircleWeeklyStats.week_start.desc()).limit(weeks).all()
+    
+    return CircleWellnessResponse(circle_id=circle_id, weeks=stats)
+
 @router.delete("/{circle_id}/members/{user_id}")
 def remove_circle_member(
     circle_id: int,
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user),
+    access: CircleAccess = Depends(get_circle_access)
 ):
-    circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
-    
-    if circle.created_by != current_user.id:
+    if not access.is_owner:
         raise HTTPException(status_code=403, detail="Only the owner can remove members")
     
     membership = db.query(CircleMember).filter(
@@ -191,52 +213,53 @@ def remove_circle_member(
         raise HTTPException(status_code=400, detail="Cannot remove yourself")
     
     db.delete(membership)
+    mark_read(db, user_id, circle_id)
+    invalidate_circle_leaderboard(db, circle_id)
     db.commit()
+    invalidate_circle_access(circle_id, user_id)
+    _publish_membership_change(circle_id, user_id)
     
     return {"message": "Member removed successfully"}
 
 @router.get("/{circle_id}/messages", response_model=List[MessageResponse])
 def get_circle_messages(
     circle_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    before: Optional[str] = Query(None, description="X-Next-Cursor from the previous page of older messages"),
+    since: Optional[int] = Query(None, ge=0, description="Only messages after this message id, oldest first"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    access: CircleAccess = Depends(get_member_access)
 ):
-    circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
+    if before and since is not None:
+        raise HTTPException(status_code=400, detail="Use either before or since, not both")
     
-    is_member = db.query(CircleMember).filter(
-        CircleMember.circle_id == circle_id,
-        CircleMember.user_id == current_user.id
-    ).first()
-    
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Not a member of this circle")
-    
-    messages = db.query(EncouragementMessage).filter(
+    query = db.query(EncouragementMessage).filter(
         EncouragementMessage.circle_id == circle_id
-    ).order_by(EncouragementMessage.created_at.desc()).all()
+    )
     
-    return messages
+    if since is not None:
+        # Oldest first: call again with since=<last id> while X-Next-Cursor is set
+        return keyset_page(
+            query.filter(EncouragementMessage.id > since), response,
+            EncouragementMessage.id, limit, descending=False
+        )
+    
+    return keyset_page(
+        query, response, EncouragementMessage.id, limit,
+        cursor=before, sort_column=EncouragementMessage.created_at
+    )
 
 @router.post("/{circle_id}/message", response_model=MessageResponse)
 def send_message(
     circle_id: int,
     message: MessageCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user),
+    access: CircleAccess = Depends(get_member_access)
 ):
-    circle = db.query(SupportCircle).filter(SupportCircle.id == circle_id).first()
-    if not circle:
-        raise HTTPException(status_code=404, detail="Circle not found")
-    
-    is_member = db.query(CircleMember).filter(
-        CircleMember.circle_id == circle_id,
-        CircleMember.user_id == current_user.id
-    ).first()
-    
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Not a member of this circle")
+    if not load_circle_access(db, circle_id, message.receiver_id).is_member:
+        raise HTTPException(status_code=400, detail="Receiver is not a member of this circle")
     
     db_message = EncouragementMessage(
         circle_id=circle_id,
@@ -245,6 +268,108 @@ def send_message(
         message=message.message
     )
     db.add(db_message)
+    count_new_message(db, db_message)
     db.commit()
     db.refresh(db_message)
+    
+    get_broker().publish(
+        circle_channel(circle_id),
+        MessageResponse.model_validate(db_message).model_dump(mode="json")
+    )
     return db_message
+
+def _publish_membership_change(circle_id: int, user_id: Optional[int] = None):
+    """Tell open event streams to re-check membership (user_id None: everyone's)"""
+    get_broker().publish(circle_channel(circle_id), {"event": "membership", "user_id": user_id})
+
+def _check_circle_member(circle_id: int, user_id: int):
+    # Own short-lived session: the stream can stay open for hours
+    db = SessionLocal()
+    try:
+        require_circle_member(load_circle_access(db, circle_id, user_id))
+    finally:
+        db.close()
+
+def _is_circle_member(circle_id: int, user_id: int) -> bool:
+    try:
+        _check_circle_member(circle_id, user_id)
+    except HTTPException:
+        return False
+    return True
+
+def _messages_after(circle_id: int, last_id: int) -> list:
+    db = SessionLocal()
+    try:
+        messages = db.query(EncouragementMessage).filter(
+            EncouragementMessage.circle_id == circle_id,
+            EncouragementMessage.id > last_id
+        ).order_by(EncouragementMessage.id).limit(REPLAY_BATCH_SIZE).all()
+        return [MessageResponse.model_validate(m).model_dump(mode="json") for m in messages]
+    finally:
+        db.close()
+
+def _message_event(message: dict) -> str:
+    return f"id: {message['id']}\nevent: message\ndata: {json.dumps(message)}\n\n"
+
+@router.get("/{circle_id}/events")
+async def circle_events(
+    circle_id: int,
+    since: Optional[int] = Query(None, ge=0, description="Replay messages after this message id first"),
+    last_event_id: Optional[int] = Header(None, description="Sent by EventSource on reconnect; overrides since"),
+    current_user: Identity = Depends(get_stream_user)
+):
+    """
+    Server-Sent Events stream of new circle messages. Replays anything
+    after the resume id from the database, then relays live messages.
+    The stream ends once the user is no longer a member.
+    """
+    user_id = current_user.id
+    await run_in_threadpool(_check_circle_member, circle_id, user_id)
+    resume_from = last_event_id if last_event_id is not None else since
+    broker = get_broker()
+    
+    async def stream():
+        # Subscribe before replaying so nothing sent in between is lost
+        subscription = broker.subscribe(circle_channel(circle_id))
+        try:
+            yield "retry: 3000\n\n"
+            last_id = resume_from
+            while last_id is not None:
+                batch = await run_in_threadpool(_messages_after, circle_id, last_id)
+                for message in batch:
+                    yield _message_event(message)
+                    last_id = message["id"]
+                if len(batch) < REPLAY_BATCH_SIZE:
+                    break
+            
+            checked_at = time.monotonic()
+            while True:
+                try:
+                    message = await subscription.get(EVENT_KEEPALIVE_SECONDS)
+                except ConnectionResetError:
+                    return  # too far behind; the client reconnects and replays
+                
+                membership_changed = message is not None and message.get("event") == "membership"
+                if (
+                    (membership_changed and message["user_id"] in (None, user_id))
+                    or time.monotonic() - checked_at >= MEMBERSHIP_RECHECK_SECONDS
+                ):
+                    if not await run_in_threadpool(_is_circle_member, circle_id, user_id):
+                        return  # reconnecting gets a 403
+                    checked_at = time.monotonic()
+                
+                if membership_changed:
+                    continue
+                if message is None:
+                    yield ": keepalive\n\n"
+                elif last_id is None or message["id"] > last_id:
+                    last_id = message["id"]
+                    yield _message_event(message)
+        finally:
+            broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,167 +1,272 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import FileResponse
+from sqlalchemy import select, cast, type_coerce, Float, String
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import get_current_user
-from models.user_model import User
+from utils.auth import Identity, get_current_user
+from utils.account_export import active_job, export_path, purge_exports, run_export_job
+from utils.account_import import restore_archive
+from utils.export import CHUNK_ROWS, COLUMNAR_FORMATS, export_response, columnar_response, stream_records
 from models.journal_model import JournalEntry
 from models.medication_model import Medication
 from models.medication_log_model import MedicationLog
 from models.fitness_log_model import FitnessLog
-from datetime import date, datetime
+from models.export_job_model import ExportJob, ExportStatus
+from schemas.export_schema import ExportJobResponse, AccountImportResponse
+from datetime import date
 from typing import Optional
-import json
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
-@router.get("/journal")
-def export_journal(
-    format: str = Query("json", regex="^(json|csv)$"),
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    query = db.query(JournalEntry).filter(JournalEntry.user_id == current_user.id)
-    
+EXPORT_FORMATS = "^(json|csv|ndjson|parquet|arrow)$"
+
+JOURNAL_COLUMNS = ["id", "content", "sentiment_score", "emotion_label", "risk_flag", "created_at"]
+MEDICATION_COLUMNS = ["medication_id", "medication_name", "dosage", "taken_date", "taken"]
+FITNESS_COLUMNS = ["id", "log_date", "activity_completed", "steps", "minutes_exercised", "intensity"]
+
+# Column types for the Parquet / Arrow exports, in select order
+JOURNAL_ARROW_TYPES = ["int64", "string", "double", "string", "bool", "timestamp[us]"]
+MEDICATION_ARROW_TYPES = ["int64", "string", "string", "date32", "bool"]
+FITNESS_ARROW_TYPES = ["int64", "date32", "bool", "int32", "int32", "string"]
+
+
+def _journal_filters(user_id: int, start_date: Optional[date], end_date: Optional[date]) -> list:
+    filters = [JournalEntry.user_id == user_id]
+    if start_date:
+        filters.append(JournalEntry.created_at >= start_date)
+    if end_date:
+        filters.append(JournalEntry.created_at <= end_date)
+    return filters
+
+
+def _fitness_filters(user_id: int, start_date: Optional[date], end_date: Optional[date]) -> list:
+    filters = [FitnessLog.user_id == user_id]
     if start_date:
-        query = query.filter(JournalEntry.created_at >= start_date)
+        filters.append(FitnessLog.log_date >= start_date)
     if end_date:
-        query = query.filter(JournalEntry.created_at <= end_date)
-    
-    entries = query.order_by(JournalEntry.created_at.desc()).all()
-    
-    if format == "json":
-        data = []
-        for entry in entries:
-            data.append({
-                "id": entry.id,
-                "content": entry.content,
-                "sentiment_score": float(entry.sentiment_score) if entry.sentiment_score else None,
-                "emotion_label": entry.emotion_label,
-                "risk_flag": entry.risk_flag,
-                "created_at": entry.created_at.isoformat() if entry.created_at else None
-            })
-        return {
-            "format": "json",
-            "count": len(data),
-            "data": data
+        filters.append(FitnessLog.log_date <= end_date)
+    return filters
+
+
+def _journal_records(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    query = db.query(JournalEntry).filter(*_journal_filters(user_id, start_date, end_date))
+
+    for entry in query.order_by(JournalEntry.created_at.desc(), JournalEntry.id.desc()).yield_per(CHUNK_ROWS):
+        yield {
+            "id": entry.id,
+            "content": entry.content,
+            "sentiment_score": float(entry.sentiment_score) if entry.sentiment_score is not None else None,
+            "emotion_label": entry.emotion_label,
+            "risk_flag": entry.risk_flag,
+            "created_at": entry.created_at
         }
-    
-    # CSV format
-    csv_lines = ["id,content,sentiment_score,emotion_label,risk_flag,created_at"]
-    for entry in entries:
-        content = entry.content.replace('"', '""')
-        csv_lines.append(
-            f'{entry.id},"{content}",{entry.sentiment_score or ""},{entry.emotion_label or ""},{entry.risk_flag},{entry.created_at or ""}'
-        )
-    
-    return {
-        "format": "csv",
-        "count": len(entries),
-        "data": "\n".join(csv_lines)
-    }
 
-@router.get("/medications")
-def export_medications(
-    format: str = Query("json", regex="^(json|csv)$"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+
+def _medication_records(db: Session, user_id: int, flat: bool):
+    """
+    Walk medications and their logs side by side: both are ordered by
+    medication id, so each medication's logs are the next run in the log
+    stream and the grouping is a single linear merge. Only the logs are
+    streamed; a connection can't hold two server-side cursors at once.
+    """
     medications = db.query(Medication).filter(
-        Medication.user_id == current_user.id
-    ).all()
-    
-    med_ids = [m.id for m in medications]
-    logs = []
-    if med_ids:
-        logs = db.query(MedicationLog).filter(
-            MedicationLog.medication_id.in_(med_ids)
-        ).order_by(MedicationLog.taken_date.desc()).all()
-    
-    if format == "json":
-        meds_data = []
-        for med in medications:
-            med_logs = [l for l in logs if l.medication_id == med.id]
-            meds_data.append({
+        Medication.user_id == user_id
+    ).order_by(Medication.id).all()
+
+    logs = iter(db.query(
+        MedicationLog.medication_id, MedicationLog.taken_date, MedicationLog.taken
+    ).join(
+        Medication, Medication.id == MedicationLog.medication_id
+    ).filter(
+        Medication.user_id == user_id
+    ).order_by(
+        MedicationLog.medication_id, MedicationLog.taken_date.desc()
+    ).yield_per(CHUNK_ROWS))
+
+    pending = next(logs, None)
+    for med in medications:
+        med_logs = []
+        while pending is not None and pending.medication_id <= med.id:
+            if pending.medication_id == med.id:
+                med_logs.append(pending)
+            pending = next(logs, None)
+
+        if flat:
+            if not med_logs:
+                yield {"medication_id": med.id, "medication_name": med.name, "dosage": med.dosage}
+            for log in med_logs:
+                yield {
+                    "medication_id": med.id,
+                    "medication_name": med.name,
+                    "dosage": med.dosage,
+                    "taken_date": log.taken_date,
+                    "taken": log.taken
+                }
+        else:
+            yield {
                 "id": med.id,
                 "name": med.name,
                 "dosage": med.dosage,
                 "frequency_per_day": med.frequency_per_day,
-                "reminder_time": med.reminder_time.isoformat() if med.reminder_time else None,
-                "logs": [
-                    {
-                        "taken_date": log.taken_date.isoformat() if log.taken_date else None,
-                        "taken": log.taken
-                    }
-                    for log in med_logs
-                ]
-            })
-        return {
-            "format": "json",
-            "count": len(meds_data),
-            "data": meds_data
+                "reminder_time": med.reminder_time,
+                "logs": [{"taken_date": log.taken_date, "taken": log.taken} for log in med_logs]
+            }
+
+
+def _fitness_records(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    query = db.query(FitnessLog).filter(*_fitness_filters(user_id, start_date, end_date))
+
+    for log in query.order_by(FitnessLog.log_date.desc(), FitnessLog.id.desc()).yield_per(CHUNK_ROWS):
+        yield {
+            "id": log.id,
+            "log_date": log.log_date,
+            "activity_completed": log.activity_completed,
+            "steps": log.steps,
+            "minutes_exercised": log.minutes_exercised,
+            "intensity": log.intensity
         }
-    
-    # CSV format
-    csv_lines = ["medication_id,medication_name,dosage,taken_date,taken"]
-    for med in medications:
-        med_logs = [l for l in logs if l.medication_id == med.id]
-        if not med_logs:
-            csv_lines.append(f'{med.id},{med.name},{med.dosage or ""},,')
-        for log in med_logs:
-            csv_lines.append(
-                f'{med.id},{med.name},{med.dosage or ""},{log.taken_date},{log.taken}'
-            )
-    
-    return {
-        "format": "csv",
-        "count": len(medications),
-        "data": "\n".join(csv_lines)
-    }
+
+
+def _journal_select(user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    return select(
+        JournalEntry.id,
+        JournalEntry.content,
+        cast(JournalEntry.sentiment_score, Float),
+        JournalEntry.emotion_label,
+        JournalEntry.risk_flag,
+        JournalEntry.created_at
+    ).where(
+        *_journal_filters(user_id, start_date, end_date)
+    ).order_by(JournalEntry.created_at.desc(), JournalEntry.id.desc())
+
+
+def _medication_select(user_id: int):
+    """One row per dose log, with null log columns for medications without logs"""
+    return select(
+        Medication.id,
+        Medication.name,
+        Medication.dosage,
+        MedicationLog.taken_date,
+        MedicationLog.taken
+    ).outerjoin(
+        MedicationLog, MedicationLog.medication_id == Medication.id
+    ).where(
+        Medication.user_id == user_id
+    ).order_by(Medication.id, MedicationLog.taken_date.desc())
+
+
+def _fitness_select(user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    return select(
+        FitnessLog.id,
+        FitnessLog.log_date,
+        FitnessLog.activity_completed,
+        FitnessLog.steps,
+        FitnessLog.minutes_exercised,
+        type_coerce(FitnessLog.intensity, String)
+    ).where(
+        *_fitness_filters(user_id, start_date, end_date)
+    ).order_by(FitnessLog.log_date.desc(), FitnessLog.id.desc())
+
+
+@router.get("/journal")
+def export_journal(
+    format: str = Query("json", pattern=EXPORT_FORMATS),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: Identity = Depends(get_current_user)
+):
+    if format in COLUMNAR_FORMATS:
+        statement = _journal_select(current_user.id, start_date, end_date)
+        return columnar_response(format, statement, list(zip(JOURNAL_COLUMNS, JOURNAL_ARROW_TYPES)), "journal")
+
+    records = stream_records(_journal_records, current_user.id, start_date, end_date)
+    return export_response(format, JOURNAL_COLUMNS, records, "journal")
+
+@router.get("/medications")
+def export_medications(
+    format: str = Query("json", pattern=EXPORT_FORMATS),
+    current_user: Identity = Depends(get_current_user)
+):
+    if format in COLUMNAR_FORMATS:
+        statement = _medication_select(current_user.id)
+        return columnar_response(format, statement, list(zip(MEDICATION_COLUMNS, MEDICATION_ARROW_TYPES)), "medications")
+
+    records = stream_records(_medication_records, current_user.id, format == "csv")
+    return export_response(format, MEDICATION_COLUMNS, records, "medications")
 
 @router.get("/fitness")
 def export_fitness(
-    format: str = Query("json", regex="^(json|csv)$"),
+    format: str = Query("json", pattern=EXPORT_FORMATS),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    current_user: Identity = Depends(get_current_user)
+):
+    if format in COLUMNAR_FORMATS:
+        statement = _fitness_select(current_user.id, start_date, end_date)
+        return columnar_response(format, statement, list(zip(FITNESS_COLUMNS, FITNESS_ARROW_TYPES)), "fitness")
+
+    records = stream_records(_fitness_records, current_user.id, start_date, end_date)
+    return export_response(format, FITNESS_COLUMNS, records, "fitness")
+
+
+@router.post("/jobs", response_model=ExportJobResponse, status_code=202)
+def create_export_job(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
-    query = db.query(FitnessLog).filter(FitnessLog.user_id == current_user.id)
-    
-    if start_date:
-        query = query.filter(FitnessLog.log_date >= start_date)
-    if end_date:
-        query = query.filter(FitnessLog.log_date <= end_date)
-    
-    logs = query.order_by(FitnessLog.log_date.desc()).all()
-    
-    if format == "json":
-        data = []
-        for log in logs:
-            data.append({
-                "id": log.id,
-                "log_date": log.log_date.isoformat() if log.log_date else None,
-                "activity_completed": log.activity_completed,
-                "steps": log.steps,
-                "minutes_exercised": log.minutes_exercised,
-                "intensity": log.intensity.value
-            })
-        return {
-            "format": "json",
-            "count": len(data),
-            "data": data
-        }
-    
-    # CSV format
-    csv_lines = ["id,log_date,activity_completed,steps,minutes_exercised,intensity"]
-    for log in logs:
-        csv_lines.append(
-            f'{log.id},{log.log_date},{log.activity_completed},{log.steps},{log.minutes_exercised},{log.intensity.value}'
-        )
-    
-    return {
-        "format": "csv",
-        "count": len(logs),
-        "data": "\n".join(csv_lines)
-    }
+    """Queue a full-account export. Earlier exports are deleted when a new one starts."""
+    if active_job(db, current_user.id):
+        raise HTTPException(status_code=409, detail="An export is already in progress")
+
+    purge_exports(db, current_user.id)
+    job = ExportJob(user_id=current_user.id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    background_tasks.add_task(run_export_job, job.id)
+    return job
+
+def _get_user_job(job_id: int, db: Session, user_id: int) -> ExportJob:
+    job = db.query(ExportJob).filter(
+        ExportJob.id == job_id,
+        ExportJob.user_id == user_id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ExportJobResponse)
+def get_export_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    return _get_user_job(job_id, db, current_user.id)
+
+@router.get("/jobs/{job_id}/download")
+def download_export(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    """Serve the finished archive. Supports Range requests for resumable downloads."""
+    job = _get_user_job(job_id, db, current_user.id)
+    if job.status != ExportStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Export is not ready")
+
+    return FileResponse(
+        export_path(job.id),
+        media_type="application/zip",
+        filename=f"mindmesh-export-{job.id}.zip"
+    )
+
+@router.post("/import", response_model=AccountImportResponse)
+def import_account(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    """Restore an archive from GET /export/jobs/{job_id}/download into this account"""
+    return restore_archive(db, current_user.id, file.file)
@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Response
+from sqlalchemy import func, case, literal_column
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import get_current_user
-from models.user_model import User
+from utils.auth import Identity, get_current_user
+from utils.bulk import upsert_rows
+from utils.chunked_import import import_records
+from utils.sql import period_start, period_of, as_date
+from utils.pagination import keyset_page, set_total_count
+from utils.leaderboard import invalidate_member_leaderboards
 from models.fitness_log_model import FitnessLog, Intensity
 from schemas.fitness_schema import (
     FitnessCreate, FitnessResponse, 
     WeeklyFitnessResponse, Intensity as IntensityEnum,
-    FitnessUpdate, MonthlyFitnessResponse
+    FitnessUpdate, MonthlyFitnessResponse,
+    FitnessImportResponse, FitnessImportError,
+    FitnessRollupResponse
 )
 from typing import List, Optional
 from datetime import date, timedelta
 from calendar import monthrange
+from types import SimpleNamespace
+import codecs
+import csv
+import json
+
+# Default look-back when a rollup request omits `from`
+ROLLUP_DEFAULT_DAYS = {"day": 30, "week": 7 * 12, "month": 365, "year": 365 * 5}
+
+# Weights averaged into avg_intensity
+INTENSITY_VALUES = {Intensity.LOW: 1, Intensity.MEDIUM: 2, Intensity.HIGH: 3}
 
 router = APIRouter(prefix="/fitness", tags=["Fitness"])
 
@@ -19,8 +37,9 @@ router = APIRouter(prefix="/fitness", tags=["Fitness"])
 def create_fitness_log(
     fitness: FitnessCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
+    _check_date_free(db, current_user.id, fitness.log_date)
     db_fitness = FitnessLog(
         user_id=current_user.id,
         log_date=fitness.log_date,
@@ -30,18 +49,125 @@ def create_fitness_log(
         intensity=Intensity[fitness.intensity.value]
     )
     db.add(db_fitness)
-    db.commit()
+    invalidate_member_leaderboards(db, current_user.id)
+    _commit_log(db)
     db.refresh(db_fitness)
     return db_fitness
 
+def _check_date_free(db: Session, user_id: int, log_date: date, log_id: Optional[int] = None):
+    """409 if the user already has a different log for log_date"""
+    query = db.query(FitnessLog.id).filter(
+        FitnessLog.user_id == user_id,
+        FitnessLog.log_date == log_date
+    )
+    if log_id is not None:
+        query = query.filter(FitnessLog.id != log_id)
+    if query.first():
+        raise HTTPException(status_code=409, detail="A fitness log already exists for this date")
+
+def _commit_log(db: Session):
+    # A concurrent request can take the date between the check and the commit
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A fitness log already exists for this date")
+
+def _iter_import_records(upload: UploadFile, format: str):
+    """Yield (row_number, record) pairs without reading the whole file"""
+    text = codecs.getreader("utf-8-sig")(upload.file)
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            yield row_number, {k: v for k, v in row.items() if k and v not in ("", None)}
+        return
+    
+    for row_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, e
+
+def _import_chunk(chunk: list, user_id: int, db: Session) -> int:
+    """Insert a validated chunk, skipping dates the user already logged. The caller commits."""
+    dates = {item.log_date for item in chunk}
+    existing = {
+        row.log_date for row in db.query(FitnessLog.log_date).filter(
+            FitnessLog.user_id == user_id,
+            FitnessLog.log_date.in_(dates)
+        )
+    }
+    
+    rows = []
+    for item in chunk:
+        if item.log_date in existing:
+            continue
+        existing.add(item.log_date)
+        rows.append({
+            "user_id": user_id,
+            "log_date": item.log_date,
+            "activity_completed": item.activity_completed,
+            "steps": item.steps,
+            "minutes_exercised": item.minutes_exercised,
+            "intensity": Intensity[item.intensity.value]
+        })
+    
+    # The unique (user_id, log_date) index settles concurrent imports of the same dates
+    upsert_rows(
+        db, FitnessLog, rows,
+        index_elements=["user_id", "log_date"],
+        update_columns=[]
+    )
+    return len(rows)
+
+@router.post("/import", response_model=FitnessImportResponse)
+def import_fitness_logs(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the file extension"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            format = "csv"
+        elif filename.endswith((".ndjson", ".jsonl")):
+            format = "ndjson"
+        else:
+            raise HTTPException(status_code=400, detail="Unknown file format, pass format=csv or format=ndjson")
+    
+    errors = []
+    try:
+        counts = import_records(
+            _iter_import_records(file, format), FitnessCreate,
+            lambda chunk: _import_chunk(chunk, current_user.id, db),
+            errors, lambda row, error: FitnessImportError(row=row, error=error)
+        )
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The import is all-or-nothing, so the file can be fixed and re-sent
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Could not read file, nothing was imported: {e}")
+    
+    if counts["imported"]:
+        invalidate_member_leaderboards(db, current_user.id)
+    db.commit()
+    
+    return FitnessImportResponse(**counts, errors=errors)
+
 @router.get("", response_model=List[FitnessResponse])
 def get_fitness_logs(
-    page: int = Query(1, ge=1),
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is set)"),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    include_total: bool = Query(False, description="Return the match count in X-Total-Count"),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     query = db.query(FitnessLog).filter(FitnessLog.user_id == current_user.id)
     
@@ -50,15 +176,184 @@ def get_fitness_logs(
     if end_date:
         query = query.filter(FitnessLog.log_date <= end_date)
     
-    offset = (page - 1) * limit
-    logs = query.order_by(FitnessLog.log_date.desc()).offset(offset).limit(limit).all()
-    return logs
+    if include_total:
+        set_total_count(response, query)
+    
+    return keyset_page(
+        query, response, FitnessLog.id, limit,
+        cursor=cursor, sort_column=FitnessLog.log_date,
+        offset=(page - 1) * limit
+    )
+
+def _fitness_rollup(db: Session, user_id: int, granularity: str, start_date: date, end_date: date) -> list:
+    """Sum fitness logs into day/week/month/year buckets in the database"""
+    period = period_start(FitnessLog.log_date, granularity, db.get_bind().dialect.name)
+    if period is None:
+        return _fitness_rollup_in_python(db, user_id, granularity, start_date, end_date)
+    period = period.label("period")
+    intensity_value = case(
+        (FitnessLog.intensity == Intensity.HIGH, INTENSITY_VALUES[Intensity.HIGH]),
+        (FitnessLog.intensity == Intensity.MEDIUM, INTENSITY_VALUES[Intensity.MEDIUM]),
+        else_=INTENSITY_VALUES[Intensity.LOW]
+    )
+    
+    return db.query(
+        period,
+        func.coalesce(func.sum(FitnessLog.steps), 0).label("steps"),
+        func.coalesce(func.sum(FitnessLog.minutes_exercised), 0).label("minutes"),
+        func.count(func.distinct(case((FitnessLog.activity_completed == True, FitnessLog.log_date)))).label("days_active"),
+        func.count(FitnessLog.id).label("logs"),
+        func.sum(intensity_value).label("intensity_total")
+    ).filter(
+        FitnessLog.user_id == user_id,
+        FitnessLog.log_date >= start_date,
+        FitnessLog.log_date <= end_date
+    ).group_by(literal_column("period")).order_by(literal_column("period")).all()
+
+def _fitness_rollup_in_python(db: Session, user_id: int, granularity: str, start_date: date, end_date: date) -> list:
+    """_fitness_rollup for databases without date bucketing functions"""
+    buckets = {}
+    for log in db.query(
+        FitnessLog.log_date, FitnessLog.steps, FitnessLog.minutes_exercised,
+        FitnessLog.activity_completed, FitnessLog.intensity
+    ).filter(
+        FitnessLog.user_id == user_id,
+        FitnessLog.log_date >= start_date,
+        FitnessLog.log_date <= end_date
+    ):
+        period = period_of(log.log_date, granularity)
+        bucket = buckets.setdefault(period, SimpleNamespace(
+            period=period, steps=0, minutes=0, active_dates=set(), logs=0, intensity_total=0
+        ))
+        bucket.steps += log.steps or 0
+        bucket.minutes += log.minutes_exercised or 0
+        if log.activity_completed:
+            bucket.active_dates.add(log.log_date)
+        bucket.logs += 1
+        bucket.intensity_total += INTENSITY_VALUES.get(log.intensity, 1)
+    
+    for bucket in buckets.values():
+        bucket.days_active = len(bucket.active_dates)
+    return [buckets[period] for period in sorted(buckets)]
+
+def _activity_streak(db: Session, user_id: int, today: date) -> int:
+    """Consecutive active days ending today, read newest first in one query"""
+    active_dates = db.query(FitnessLog.log_date).filter(
+        FitnessLog.user_id == user_id,
+        FitnessLog.log_date <= today,
+        FitnessLog.activity_completed == True
+    ).distinct().order_by(FitnessLog.log_date.desc()).yield_per(100)
+    
+    streak = 0
+    expected = today
+    for (log_date,) in active_dates:
+        if log_date != expected:
+            break
+        streak += 1
+        expected -= timedelta(days=1)
+    return streak
+
+@router.get("/rollup", response_model=FitnessRollupResponse)
+def get_fitness_rollup(
+    granularity: str = Query("day", pattern="^(day|week|month|year)$"),
+    start_date: Optional[date] = Query(None, alias="from", description="Default depends on granularity"),
+    end_date: Optional[date] = Query(None, alias="to", description="Default: today"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    if end_date is None:
+        end_date = date.today()
+    if start_date is None:
+        start_date = end_date - timedelta(days=ROLLUP_DEFAULT_DAYS[granularity] - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    buckets = _fitness_rollup(db, current_user.id, granularity, start_date, end_date)
+    
+    return FitnessRollupResponse(
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+        periods=[as_date(b.period) for b in buckets],
+        steps=[int(b.steps) for b in buckets],
+        minutes=[int(b.minutes) for b in buckets],
+        days_active=[int(b.days_active) for b in buckets],
+        logs=[int(b.logs) for b in buckets],
+        avg_intensity=[round(int(b.intensity_total) / b.logs, 2) for b in buckets]
+    )
+
+@router.get("/weekly", response_model=WeeklyFitnessResponse)
+def get_weekly_fitness(
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    today = date.today()
+    week_ago = today - timedelta(days=6)
+    
+    buckets = _fitness_rollup(db, current_user.id, "day", week_ago, today)
+    
+    if not buckets:
+        return WeeklyFitnessResponse(
+            total_steps=0, total_minutes=0,
+            avg_intensity="LOW", days_active=0, current_streak=0
+        )
+    
+    logs = sum(b.logs for b in buckets)
+    avg_intensity_val = sum(int(b.intensity_total) for b in buckets) / logs
+    avg_intensity = "LOW" if avg_intensity_val < 1.5 else "MEDIUM" if avg_intensity_val < 2.5 else "HIGH"
+    
+    return WeeklyFitnessResponse(
+        total_steps=sum(int(b.steps) for b in buckets),
+        total_minutes=sum(int(b.minutes) for b in buckets),
+        avg_intensity=avg_intensity,
+        days_active=sum(int(b.days_active) for b in buckets),
+        current_streak=_activity_streak(db, current_user.id, today)
+    )
+
+@router.get("/monthly", response_model=MonthlyFitnessResponse)
+def get_monthly_fitness(
+    year: int = Query(default=None, description="Year (default: current year)"),
+    month: int = Query(default=None, ge=1, le=12, description="Month (default: current month)"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    today = date.today()
+    if year is None:
+        year = today.year
+    if month is None:
+        month = today.month
+    
+    _, last_day = monthrange(year, month)
+    start_date = date(year, month, 1)
+    end_date = date(year, month, last_day)
+    
+    buckets = _fitness_rollup(db, current_user.id, "month", start_date, end_date)
+    
+    if not buckets:
+        return MonthlyFitnessResponse(
+            year=year, month=month,
+            total_steps=0, total_minutes=0,
+            days_active=0, avg_daily_steps=0
+        )
+    
+    bucket = buckets[0]
+    total_steps = int(bucket.steps)
+    days_active = int(bucket.days_active)
+    avg_daily_steps = total_steps / days_active if days_active > 0 else 0
+    
+    return MonthlyFitnessResponse(
+        year=year, month=month,
+        total_steps=total_steps,
+        total_minutes=int(bucket.minutes),
+        days_active=days_active,
+        avg_daily_steps=round(avg_daily_steps, 0)
+    )
 
 @router.get("/{log_id}", response_model=FitnessResponse)
 def get_fitness_log(
     log_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     log = db.query(FitnessLog).filter(
         FitnessLog.id == log_id,
@@ -75,7 +370,7 @@ def update_fitness_log(
     log_id: int,
     fitness: FitnessUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     log = db.query(FitnessLog).filter(
         FitnessLog.id == log_id,
@@ -86,6 +381,7 @@ def update_fitness_log(
         raise HTTPException(status_code=404, detail="Fitness log not found")
     
     if fitness.log_date is not None:
+        _check_date_free(db, current_user.id, fitness.log_date, log_id)
         log.log_date = fitness.log_date
     if fitness.activity_completed is not None:
         log.activity_completed = fitness.activity_completed
@@ -96,7 +392,8 @@ def update_fitness_log(
     if fitness.intensity is not None:
         log.intensity = Intensity[fitness.intensity.value]
     
-    db.commit()
+    invalidate_member_leaderboards(db, current_user.id)
+    _commit_log(db)
     db.refresh(log)
     return log
 
@@ -104,7 +401,7 @@ def update_fitness_log(
 def delete_fitness_log(
     log_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     log = db.query(FitnessLog).filter(
         FitnessLog.id == log_id,
@@ -115,103 +412,7 @@ def delete_fitness_log(
         raise HTTPException(status_code=404, detail="Fitness log not found")
     
     db.delete(log)
+    invalidate_member_leaderboards(db, current_user.id)
     db.commit()
     
     return {"message": "Fitness log deleted successfully"}
-
-@router.get("/weekly")
-def get_weekly_fitness(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    today = date.today()
-    week_ago = today - timedelta(days=6)
-    
-    logs = db.query(FitnessLog).filter(
-        FitnessLog.user_id == current_user.id,
-        FitnessLog.log_date >= week_ago,
-        FitnessLog.log_date <= today
-    ).all()
-    
-    if not logs:
-        return {
-            "total_steps": 0, "total_minutes": 0,
-            "avg_intensity": "LOW", "days_active": 0, "current_streak": 0
-        }
-    
-    total_steps = sum(log.steps for log in logs)
-    total_minutes = sum(log.minutes_exercised for log in logs)
-    
-    unique_dates = set(log.log_date for log in logs)
-    days_with_completion = set(log.log_date for log in logs if log.activity_completed)
-    days_active = len(days_with_completion)
-    
-    intensity_map = {"LOW": 1, "MEDIUM": 2, "HIGH": 3}
-    avg_intensity_val = sum(intensity_map.get(log.intensity.value, 1) for log in logs) / len(logs)
-    avg_intensity = "LOW" if avg_intensity_val < 1.5 else "MEDIUM" if avg_intensity_val < 2.5 else "HIGH"
-    
-    streak = 0
-    check_date = today
-    while True:
-        has_activity = db.query(FitnessLog).filter(
-            FitnessLog.user_id == current_user.id,
-            FitnessLog.log_date == check_date,
-            FitnessLog.activity_completed == True
-        ).first() is not None
-        
-        if has_activity:
-            streak += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
-    
-    return {
-        "total_steps": total_steps,
-        "total_minutes": total_minutes,
-        "avg_intensity": avg_intensity,
-        "days_active": days_active,
-        "current_streak": streak
-    }
-
-@router.get("/monthly", response_model=MonthlyFitnessResponse)
-def get_monthly_fitness(
-    year: int = Query(default=None, description="Year (default: current year)"),
-    month: int = Query(default=None, ge=1, le=12, description="Month (default: current month)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    today = date.today()
-    if year is None:
-        year = today.year
-    if month is None:
-        month = today.month
-    
-    _, last_day = monthrange(year, month)
-    start_date = date(year, month, 1)
-    end_date = date(year, month, last_day)
-    
-    logs = db.query(FitnessLog).filter(
-        FitnessLog.user_id == current_user.id,
-        FitnessLog.log_date >= start_date,
-        FitnessLog.log_date <= end_date
-    ).all()
-    
-    if not logs:
-        return MonthlyFitnessResponse(
-            year=year, month=month,
-            total_steps=0, total_minutes=0,
-            days_active=0, avg_daily_steps=0
-        )
-    
-    total_steps = sum(log.steps for log in logs)
-    total_minutes = sum(log.minutes_exercised for log in logs)
-    days_active = sum(1 for log in logs if log.activity_completed)
-    avg_daily_steps = total_steps / days_active if days_active > 0 else 0
-    
-    return MonthlyFitnessResponse(
-        year=year, month=month,
-        total_steps=total_steps,
-        total_minutes=total_minutes,
-        days_active=days_active,
-        avg_daily_steps=round(avg_daily_steps, 0)
-    )
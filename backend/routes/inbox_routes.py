@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+from database import get_db
+from utils.auth import Identity, get_current_user
+from utils.pagination import keyset_page
+from utils.circle_access import load_circle_access, require_circle_member
+from utils.inbox import read_watermarks, unread_counts, mark_read
+from models.message_model import EncouragementMessage
+from schemas.inbox_schema import InboxMessage, CircleUnread, UnreadCounts, MarkReadRequest
+from typing import List, Optional
+
+router = APIRouter(prefix="/inbox", tags=["Inbox"])
+
+@router.get("", response_model=List[InboxMessage])
+def get_inbox(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    before: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    circle_id: Optional[int] = Query(None, description="Only messages from this circle"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    """Messages addressed to the current user across all circles, newest first"""
+    query = db.query(EncouragementMessage).filter(
+        EncouragementMessage.receiver_id == current_user.id
+    )
+    if circle_id is not None:
+        query = query.filter(EncouragementMessage.circle_id == circle_id)
+    
+    messages = keyset_page(
+        query, response, EncouragementMessage.id, limit,
+        cursor=before, sort_column=EncouragementMessage.created_at
+    )
+    watermarks = read_watermarks(db, current_user.id)
+    
+    return [
+        InboxMessage(
+            id=m.id,
+            circle_id=m.circle_id,
+            sender_id=m.sender_id,
+            receiver_id=m.receiver_id,
+            message=m.message,
+            created_at=m.created_at,
+            read=m.sender_id == current_user.id or m.id <= watermarks.get(m.circle_id, 0)
+        )
+        for m in messages
+    ]
+
+@router.get("/unread", response_model=UnreadCounts)
+def get_unread_counts(
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    """Unread message counts for the app badge, per circle and in total"""
+    counts = unread_counts(db, current_user.id)
+    return UnreadCounts(
+        total=sum(counts.values()),
+        circles=[CircleUnread(circle_id=c, unread=n) for c, n in sorted(counts.items())]
+    )
+
+@router.post("/read", response_model=CircleUnread)
+def mark_inbox_read(
+    request: MarkReadRequest,
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    """Mark a circle's messages read up to up_to_id, or all of them when it is omitted"""
+    require_circle_member(load_circle_access(db, request.circle_id, current_user.id))
+    
+    unread = mark_read(db, current_user.id, request.circle_id, request.up_to_id)
+    db.commit()
+    return CircleUnread(circle_id=request.circle_id, unread=unread)
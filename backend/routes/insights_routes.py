@@ -1,22 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import get_current_user
-from models.user_model import User
-from schemas.insights_schema import WeeklyInsightsResponse
+from utils.auth import Identity, get_current_user
+from schemas.insights_schema import WeeklyInsightsResponse, MoodPatternsResponse
 from ml.correlation import (
     calculate_mood_fitness_correlation,
     calculate_mood_medication_correlation,
     get_average_mood
 )
 from ml.prediction import predict_next_day_mood, generate_insight_summary
+from ml.patterns import get_mood_patterns
 
 router = APIRouter(prefix="/insights", tags=["Insights"])
 
 @router.get("/weekly", response_model=WeeklyInsightsResponse)
 def get_weekly_insights(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     # Calculate metrics using ML modules
     avg_mood = get_average_mood(current_user.id, db, days=7)
@@ -34,3 +34,24 @@ def get_weekly_insights(
         predicted_next_mood=predicted_mood,
         summary=summary
     )
+
+def _offset_minutes(utc_offset: str) -> int:
+    """Minutes east of UTC for "+05:30", "-3" or "9:45"; UTC-12:00 to UTC+14:00 in quarter hours"""
+    sign = -1 if utc_offset.startswith("-") else 1
+    hours, _, minutes = utc_offset.lstrip("+-").partition(":")
+    minutes = int(minutes or 0)
+    total = sign * (int(hours) * 60 + minutes)
+    if minutes >= 60 or minutes % 15 or not -12 * 60 <= total <= 14 * 60:
+        raise HTTPException(status_code=400, detail="utc_offset must be a quarter-hour offset from -12:00 to +14:00")
+    return total
+
+@router.get("/mood-patterns", response_model=MoodPatternsResponse)
+def get_mood_pattern_insights(
+    utc_offset: str = Query(
+        "0", pattern=r"^[+-]?\d{1,2}(:\d{2})?$",
+        description="Offset of the user's local time from UTC, as ±HH:MM or whole hours"
+    ),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    return get_mood_patterns(current_user.id, db, _offset_minutes(utc_offset))
@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, case, literal_column
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import get_current_user
-from models.user_model import User
-from models.journal_model import JournalEntry
-from schemas.journal_schema import JournalCreate, JournalResponse, JournalAnalysisResponse, JournalUpdate
+from utils.auth import Identity, get_current_user
+from models.journal_model import JournalEntry, EXCERPT_LENGTH
+from utils.compression import content_as_text
+from schemas.journal_schema import (
+    JournalCreate, JournalResponse, JournalAnalysisResponse, JournalUpdate,
+    JournalSearchResponse, JournalSearchHit, JournalSummaryResponse,
+    JournalFacetsResponse, SentimentHistogram, MoodSeries
+)
 from ml.sentiment import analyze_sentiment, check_risk_keywords
-from typing import List, Optional
+from ml.patterns import invalidate_mood_patterns, record_mood_entry
+from utils.pagination import keyset_page, set_total_count
+from utils.sql import period_start, period_of, as_date
+from utils.search import (
+    query_terms, index_entry, unindex_entry,
+    matching_entry_ids, search_entries, highlight
+)
+from typing import List, Optional, Union
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, date, timedelta
 
 router = APIRouter(prefix="/journal", tags=["Journal"])
 
+FACETS_DEFAULT_DAYS = 30
+
 @router.post("", response_model=JournalAnalysisResponse)
 def create_journal_entry(
     journal: JournalCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     analysis = analyze_sentiment(journal.content)
     risk_flag = check_risk_keywords(journal.content) or analysis.get("risk_flag", False)
@@ -30,6 +44,9 @@ def create_journal_entry(
     )
     
     db.add(db_entry)
+    db.flush()
+    index_entry(db, db_entry.id, current_user.id, journal.content)
+    record_mood_entry(db, db_entry)
     db.commit()
     db.refresh(db_entry)
     
@@ -39,21 +56,49 @@ def create_journal_entry(
         risk_flag=db_entry.risk_flag
     )
 
-@router.get("", response_model=List[JournalResponse])
+@router.get("", response_model=List[Union[JournalResponse, JournalSummaryResponse]])
 def get_journal_entries(
-    page: int = Query(1, ge=1, description="Page number"),
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is set)"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    include_total: bool = Query(False, description="Return the match count in X-Total-Count"),
     search: Optional[str] = Query(None, description="Search in content"),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     emotion: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$", description="summary returns an excerpt instead of content"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
-    query = db.query(JournalEntry).filter(JournalEntry.user_id == current_user.id)
+    if view == "summary":
+        # Scalar columns only; one extra character tells us if the excerpt was cut.
+        # Rows written before the excerpt column existed fall back to SUBSTR,
+        # which is safe because such rows were never compressed.
+        query = db.query(
+            JournalEntry.id,
+            JournalEntry.user_id,
+            func.coalesce(
+                JournalEntry.excerpt,
+                func.substr(content_as_text(JournalEntry.content), 1, EXCERPT_LENGTH + 1)
+            ).label("excerpt"),
+            JournalEntry.sentiment_score,
+            JournalEntry.emotion_label,
+            JournalEntry.risk_flag,
+            JournalEntry.created_at
+        )
+    else:
+        query = db.query(JournalEntry)
+    query = query.filter(JournalEntry.user_id == current_user.id)
     
     if search:
-        query = query.filter(JournalEntry.content.ilike(f"%{search}%"))
+        terms = query_terms(search)
+        if terms:
+            query = query.filter(JournalEntry.id.in_(
+                matching_entry_ids(db, current_user.id, terms)
+            ))
+        else:
+            query = query.filter(content_as_text(JournalEntry.content).ilike(f"%{search}%"))
     
     if start_date:
         query = query.filter(JournalEntry.created_at >= start_date)
@@ -64,18 +109,144 @@ def get_journal_entries(
     if emotion:
         query = query.filter(JournalEntry.emotion_label == emotion)
     
-    total = query.count()
-    offset = (page - 1) * limit
+    if include_total:
+        set_total_count(response, query)
+    
+    entries = keyset_page(
+        query, response, JournalEntry.id, limit,
+        cursor=cursor, sort_column=JournalEntry.created_at,
+        offset=(page - 1) * limit
+    )
     
-    entries = query.order_by(JournalEntry.created_at.desc()).offset(offset).limit(limit).all()
+    if view == "summary":
+        return [
+            JournalSummaryResponse(
+                id=row.id,
+                user_id=row.user_id,
+                excerpt=row.excerpt[:EXCERPT_LENGTH],
+                truncated=len(row.excerpt) > EXCERPT_LENGTH,
+                sentiment_score=row.sentiment_score,
+                emotion_label=row.emotion_label,
+                risk_flag=row.risk_flag,
+                created_at=row.created_at
+            )
+            for row in entries
+        ]
     
     return entries
 
+@router.get("/search", response_model=JournalSearchResponse)
+def search_journal_entries(
+    q: str = Query(..., min_length=1, description="Search terms"),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    terms = query_terms(q)
+    if not terms:
+        return JournalSearchResponse(total=0, page=page, limit=limit, results=[])
+    
+    total, hits = search_entries(db, current_user.id, terms, (page - 1) * limit, limit)
+    
+    entries = {
+        entry.id: entry for entry in db.query(JournalEntry).filter(
+            JournalEntry.id.in_([entry_id for entry_id, _ in hits])
+        )
+    }
+    
+    results = []
+    for entry_id, score in hits:
+        entry = entries[entry_id]
+        results.append(JournalSearchHit(
+            id=entry.id,
+            score=score,
+            highlight=highlight(entry.content, terms),
+            sentiment_score=entry.sentiment_score,
+            emotion_label=entry.emotion_label,
+            risk_flag=entry.risk_flag,
+            created_at=entry.created_at
+        ))
+    
+    return JournalSearchResponse(total=total, page=page, limit=limit, results=results)
+
+@router.get("/facets", response_model=JournalFacetsResponse)
+def get_journal_facets(
+    start_date: Optional[date] = Query(None, description=f"Default: {FACETS_DEFAULT_DAYS} days before end_date"),
+    end_date: Optional[date] = Query(None, description="Inclusive (default: today)"),
+    granularity: str = Query("day", pattern="^(day|week)$", description="Mood series bucket size"),
+    bins: int = Query(10, ge=2, le=20, description="Sentiment histogram bins over [-1, 1]"),
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    if end_date is None:
+        end_date = date.today()
+    if start_date is None:
+        start_date = end_date - timedelta(days=FACETS_DEFAULT_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    
+    in_range = (
+        JournalEntry.user_id == current_user.id,
+        JournalEntry.created_at >= start_date,
+        JournalEntry.created_at < end_date + timedelta(days=1)
+    )
+    
+    emotion_counts = db.query(
+        JournalEntry.emotion_label, func.count(JournalEntry.id)
+    ).filter(*in_range).group_by(JournalEntry.emotion_label).all()
+    
+    # Bucket i covers [edges[i], edges[i + 1]); a score of exactly 1.0 lands in the last bin
+    edges = [round(-1 + 2 * i / bins, 4) for i in range(bins + 1)]
+    bucket = case(
+        *[(JournalEntry.sentiment_score < edge, i) for i, edge in enumerate(edges[1:-1])],
+        else_=bins - 1
+    ).label("bucket")
+    counts = [0] * bins
+    for i, count in db.query(bucket, func.count(JournalEntry.id)).filter(
+        *in_range, JournalEntry.sentiment_score.isnot(None)
+    ).group_by(literal_column("bucket")).all():
+        counts[int(i)] = count
+    
+    period = period_start(JournalEntry.created_at, granularity, db.get_bind().dialect.name)
+    if period is not None:
+        mood_rows = db.query(
+            period.label("period"),
+            func.avg(JournalEntry.sentiment_score),
+            func.count(JournalEntry.id)
+        ).filter(
+            *in_range, JournalEntry.sentiment_score.isnot(None)
+        ).group_by(literal_column("period")).order_by(literal_column("period")).all()
+    else:
+        # No date bucketing functions on this database: group in Python
+        totals = {}
+        for created_at, score in db.query(JournalEntry.created_at, JournalEntry.sentiment_score).filter(
+            *in_range, JournalEntry.sentiment_score.isnot(None)
+        ):
+            total = totals.setdefault(period_of(created_at, granularity), [0, 0])
+            total[0] += score
+            total[1] += 1
+        mood_rows = [(p, total / count, count) for p, (total, count) in sorted(totals.items())]
+    
+    return JournalFacetsResponse(
+        start_date=start_date,
+        end_date=end_date,
+        total=sum(count for _, count in emotion_counts),
+        emotions={label: count for label, count in emotion_counts if label is not None},
+        sentiment_histogram=SentimentHistogram(edges=edges, counts=counts),
+        mood_series=MoodSeries(
+            granularity=granularity,
+            periods=[as_date(p) for p, _, _ in mood_rows],
+            avg_mood=[round(float(avg), 3) for _, avg, _ in mood_rows],
+            entries=[count for _, _, count in mood_rows]
+        )
+    )
+
 @router.get("/{entry_id}", response_model=JournalResponse)
 def get_journal_entry(
     entry_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     entry = db.query(JournalEntry).filter(
         JournalEntry.id == entry_id,
@@ -92,7 +263,7 @@ def update_journal_entry(
     entry_id: int,
     journal: JournalUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     entry = db.query(JournalEntry).filter(
         JournalEntry.id == entry_id,
@@ -109,6 +280,8 @@ def update_journal_entry(
         entry.sentiment_score = Decimal(str(analysis["score"]))
         entry.emotion_label = analysis["emotion"]
         entry.risk_flag = risk_flag
+        index_entry(db, entry.id, current_user.id, journal.content)
+        invalidate_mood_patterns(db, current_user.id)
     
     db.commit()
     db.refresh(entry)
@@ -118,7 +291,7 @@ def update_journal_entry(
 def delete_journal_entry(
     entry_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     entry = db.query(JournalEntry).filter(
         JournalEntry.id == entry_id,
@@ -128,6 +301,8 @@ def delete_journal_entry(
     if not entry:
         raise HTTPException(status_code=404, detail="Journal entry not found")
     
+    unindex_entry(db, entry.id)
+    invalidate_mood_patterns(db, current_user.id)
     db.delete(entry)
     db.commit()
     
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import get_current_user
-from models.user_model import User
+from utils.auth import Identity, get_current_user
 from models.medication_model import Medication
 from models.medication_log_model import MedicationLog
 from schemas.medication_schema import (
     MedicationCreate, MedicationResponse, 
     MedicationTakenRequest, MedicationSummaryResponse,
-    MedicationUpdate
+    MedicationUpdate, MedicationBulkTakenRequest,
+    MedicationBulkTakenResponse
 )
+from models.medication_adherence_model import MedicationAdherence
+from utils.pagination import keyset_page, set_total_count
+from utils.leaderboard import invalidate_member_leaderboards
+from utils.adherence import record_doses, load_adherence, adherence_streak
 from typing import List, Optional
 from datetime import date, timedelta
 
@@ -19,7 +23,7 @@ router = APIRouter(prefix="/medications", tags=["Medications"])
 def create_medication(
     medication: MedicationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     db_medication = Medication(
         user_id=current_user.id,
@@ -29,34 +33,104 @@ def create_medication(
         reminder_time=medication.reminder_time
     )
     db.add(db_medication)
+    invalidate_member_leaderboards(db, current_user.id)
     db.commit()
     db.refresh(db_medication)
     return db_medication
 
 @router.get("", response_model=List[MedicationResponse])
 def get_medications(
-    page: int = Query(1, ge=1),
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is set)"),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    include_total: bool = Query(False, description="Return the match count in X-Total-Count"),
     search: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     query = db.query(Medication).filter(Medication.user_id == current_user.id)
     
     if search:
         query = query.filter(Medication.name.ilike(f"%{search}%"))
     
-    total = query.count()
-    offset = (page - 1) * limit
+    if include_total:
+        set_total_count(response, query)
     
-    medications = query.offset(offset).limit(limit).all()
-    return medications
+    return keyset_page(
+        query, response, Medication.id, limit,
+        cursor=cursor, descending=False,
+        offset=(page - 1) * limit
+    )
+
+@router.post("/taken/bulk", response_model=MedicationBulkTakenResponse)
+def mark_medications_taken_bulk(
+    data: MedicationBulkTakenRequest,
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    requested_ids = {entry.medication_id for entry in data.entries}
+    owned_ids = {
+        row.id for row in db.query(Medication.id).filter(
+            Medication.id.in_(requested_ids),
+            Medication.user_id == current_user.id
+        )
+    }
+    missing = requested_ids - owned_ids
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Medication not found: {', '.join(str(m) for m in sorted(missing))}"
+        )
+    
+    # Last entry wins for repeated (medication, date) pairs
+    rows = {}
+    for entry in data.entries:
+        rows[(entry.medication_id, entry.taken_date)] = {
+            "medication_id": entry.medication_id,
+            "user_id": current_user.id,
+            "taken_date": entry.taken_date,
+            "taken": entry.taken
+        }
+    
+    updated = record_doses(db, list(rows.values()))
+    invalidate_member_leaderboards(db, current_user.id)
+    db.commit()
+    
+    return MedicationBulkTakenResponse(message="Updated successfully", updated=updated)
+
+@router.get("/summary", response_model=MedicationSummaryResponse)
+def get_medication_summary(
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+):
+    today = date.today()
+    week_ago = today - timedelta(days=7)
+    
+    medications = db.query(Medication.id, Medication.frequency_per_day).filter(
+        Medication.user_id == current_user.id
+    ).all()
+    
+    if not medications:
+        return MedicationSummaryResponse(current_streak=0, weekly_adherence=0.0)
+    
+    medication_ids = [m.id for m in medications]
+    total_freq = sum(m.frequency_per_day for m in medications)
+    
+    bitmaps = load_adherence(db, medication_ids, week_ago, today)
+    doses_taken = sum(bits.bit_count() for bits in bitmaps.values())
+    doses_scheduled = total_freq * 7
+    weekly_adherence = round((doses_taken / doses_scheduled * 100), 2) if doses_scheduled > 0 else 0.0
+    
+    streak = adherence_streak(db, medication_ids, today)
+    
+    return MedicationSummaryResponse(current_streak=streak, weekly_adherence=weekly_adherence)
 
 @router.get("/{medication_id}", response_model=MedicationResponse)
 def get_medication(
     medication_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     medication = db.query(Medication).filter(
         Medication.id == medication_id,
@@ -73,7 +147,7 @@ def update_medication(
     medication_id: int,
     medication: MedicationUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     db_medication = db.query(Medication).filter(
         Medication.id == medication_id,
@@ -100,7 +174,7 @@ def update_medication(
 def delete_medication(
     medication_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     medication = db.query(Medication).filter(
         Medication.id == medication_id,
@@ -113,8 +187,12 @@ def delete_medication(
     db.query(MedicationLog).filter(
         MedicationLog.medication_id == medication_id
     ).delete()
+    db.query(MedicationAdherence).filter(
+        MedicationAdherence.medication_id == medication_id
+    ).delete()
     
     db.delete(medication)
+    invalidate_member_leaderboards(db, current_user.id)
     db.commit()
     
     return {"message": "Medication deleted successfully"}
@@ -124,7 +202,7 @@ def mark_medication_taken(
     medication_id: int,
     data: MedicationTakenRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     medication = db.query(Medication).filter(
         Medication.id == medication_id,
@@ -134,75 +212,13 @@ def mark_medication_taken(
     if not medication:
         raise HTTPException(status_code=404, detail="Medication not found")
     
-    existing_log = db.query(MedicationLog).filter(
-        MedicationLog.medication_id == medication_id,
-        MedicationLog.taken_date == data.taken_date
-    ).first()
-    
-    if existing_log:
-        existing_log.taken = data.taken
-    else:
-        log = MedicationLog(
-            medication_id=medication_id,
-            user_id=current_user.id,
-            taken_date=data.taken_date,
-            taken=data.taken
-        )
-        db.add(log)
+    record_doses(db, [{
+        "medication_id": medication_id,
+        "user_id": current_user.id,
+        "taken_date": data.taken_date,
+        "taken": data.taken
+    }])
     
+    invalidate_member_leaderboards(db, current_user.id)
     db.commit()
     return {"message": "Updated successfully"}
-
-@router.get("/summary")
-def get_medication_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    today = date.today()
-    week_ago = today - timedelta(days=7)
-    
-    medications = db.query(Medication).filter(
-        Medication.user_id == current_user.id
-    ).all()
-    
-    if not medications:
-        return MedicationSummaryResponse(current_streak=0, weekly_adherence=0.0)
-    
-    medication_ids = [m.id for m in medications]
-    total_freq = sum(m.frequency_per_day for m in medications)
-    
-    logs = db.query(MedicationLog).filter(
-        MedicationLog.medication_id.in_(medication_ids),
-        MedicationLog.taken_date >= week_ago,
-        MedicationLog.taken == True
-    ).all()
-    
-    doses_taken = len(logs)
-    doses_scheduled = total_freq * 7
-    weekly_adherence = round((doses_taken / doses_scheduled * 100), 2) if doses_scheduled > 0 else 0.0
-    
-    streak = 0
-    check_date = today
-    while True:
-        day_logs = db.query(MedicationLog).filter(
-            MedicationLog.medication_id.in_(medication_ids),
-            MedicationLog.taken_date == check_date,
-            MedicationLog.taken == True
-        ).all()
-        
-        taken_counts = {}
-        for log in day_logs:
-            taken_counts[log.medication_id] = taken_counts.get(log.medication_id, 0) + 1
-        
-        all_taken = all(
-            taken_counts.get(med.id, 0) >= med.frequency_per_day
-            for med in medications
-        )
-        
-        if all_taken:
-            streak += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
-    
-    return {"current_streak": streak, "weekly_adherence": weekly_adherence}
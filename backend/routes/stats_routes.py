@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import get_current_user
-from models.user_model import User
+from utils.auth import Identity, get_current_user
 from models.journal_model import JournalEntry
 from models.medication_model import Medication
 from models.medication_log_model import MedicationLog
 from models.fitness_log_model import FitnessLog
+from utils.adherence import adherence_streak
 from datetime import date, timedelta
 from typing import Optional
 
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/stats", tags=["Stats"])
 @router.get("")
 def get_user_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     today = date.today()
     week_ago = today - timedelta(days=7)
@@ -67,21 +67,7 @@ def get_user_stats(
     
     # Calculate streaks
     # Medication streak
-    med_streak = 0
-    if medications and med_ids:
-        total_freq = sum(m.frequency_per_day for m in medications)
-        check_date = today
-        while True:
-            day_logs = db.query(MedicationLog).filter(
-                MedicationLog.medication_id.in_(med_ids),
-                MedicationLog.taken_date == check_date,
-                MedicationLog.taken == True
-            ).count()
-            if day_logs >= total_freq:
-                med_streak += 1
-                check_date -= timedelta(days=1)
-            else:
-                break
+    med_streak = adherence_streak(db, med_ids, today)
     
     # Fitness streak
     fit_streak = 0
@@ -1,16 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import get_current_user
+from utils.auth import Identity, get_current_user, get_current_user_record, invalidate_identity
 from models.user_model import User
 from schemas.user_schema import UserResponse, UserUpdate
 from utils.security import hash_password
+from utils.leaderboard import invalidate_member_leaderboards
+from utils.circle_access import invalidate_circle_access
+from utils.inbox import recount_unread
 
 router = APIRouter(prefix="/users", tags=["User"])
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: Identity = Depends(get_current_user)
 ):
     return current_user
 
@@ -18,8 +21,12 @@ def get_current_user_profile(
 def update_current_user_profile(
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_record)
 ):
+    if user_update.password is not None:
+        # Hash first, with the transaction ended so no pooled connection is held while bcrypt runs
+        db.rollback()
+        password_hash = hash_password(user_update.password)
     if user_update.name is not None:
         current_user.name = user_update.name
     if user_update.age_range is not None:
@@ -27,53 +34,84 @@ def update_current_user_profile(
     if user_update.primary_goal is not None:
         current_user.primary_goal = user_update.primary_goal
     if user_update.password is not None:
-        current_user.password = hash_password(user_update.password)
+        current_user.password = password_hash
+    for setting in ("share_mood", "share_adherence", "share_activity"):
+        value = getattr(user_update, setting)
+        if value is not None:
+            setattr(current_user, setting, value)
     
+    invalidate_member_leaderboards(db, current_user.id)
     db.commit()
+    invalidate_identity(current_user.email)
     db.refresh(current_user)
     return current_user
 
 @router.delete("/me")
 def delete_current_user(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_record)
 ):
     # Delete user's data first
     from models.journal_model import JournalEntry
+    from models.journal_term_model import JournalTerm
+    from models.mood_pattern_cache_model import MoodPatternCache
     from models.medication_model import Medication
     from models.medication_log_model import MedicationLog
+    from models.medication_adherence_model import MedicationAdherence
     from models.fitness_log_model import FitnessLog
+    from models.intraday_activity_model import IntradayActivity
     from models.circle_model import SupportCircle
     from models.circle_member_model import CircleMember
     from models.message_model import EncouragementMessage
+    from models.inbox_counter_model import InboxCounter
+    from models.circle_weekly_stats_model import CircleWeeklyStats
+    from utils.account_export import purge_exports
     
     user_id = current_user.id
+    email = current_user.email
     
+    invalidate_member_leaderboards(db, user_id)
+    db.query(JournalTerm).filter(JournalTerm.user_id == user_id).delete()
+    db.query(MoodPatternCache).filter(MoodPatternCache.user_id == user_id).delete()
     db.query(JournalEntry).filter(JournalEntry.user_id == user_id).delete()
     
     medications = db.query(Medication).filter(Medication.user_id == user_id).all()
     for med in medications:
         db.query(MedicationLog).filter(MedicationLog.medication_id == med.id).delete()
+    db.query(MedicationAdherence).filter(MedicationAdherence.user_id == user_id).delete()
     db.query(Medication).filter(Medication.user_id == user_id).delete()
     
     db.query(FitnessLog).filter(FitnessLog.user_id == user_id).delete()
+    db.query(IntradayActivity).filter(IntradayActivity.user_id == user_id).delete()
     
     memberships = db.query(CircleMember).filter(CircleMember.user_id == user_id).all()
     for membership in memberships:
         circle = db.query(SupportCircle).filter(SupportCircle.id == membership.circle_id).first()
         if circle and circle.created_by == user_id:
             db.query(EncouragementMessage).filter(EncouragementMessage.circle_id == circle.id).delete()
+            db.query(InboxCounter).filter(InboxCounter.circle_id == circle.id).delete()
+            db.query(CircleWeeklyStats).filter(CircleWeeklyStats.circle_id == circle.id).delete()
             db.query(CircleMember).filter(CircleMember.circle_id == circle.id).delete()
             db.delete(circle)
+            invalidate_circle_access(circle.id)
         else:
             db.delete(membership)
     
+    # Messages the user sent are deleted too, so their receivers' unread counts are recounted
+    receiver_ids = [row.receiver_id for row in db.query(EncouragementMessage.receiver_id).filter(
+        EncouragementMessage.sender_id == user_id
+    ).distinct()]
+    db.query(InboxCounter).filter(InboxCounter.user_id == user_id).delete()
     db.query(EncouragementMessage).filter(
         (EncouragementMessage.sender_id == user_id) | 
         (EncouragementMessage.receiver_id == user_id)
     ).delete()
+    recount_unread(db, receiver_ids)
+    
+    purge_exports(db, user_id)
     
     db.delete(current_user)
     db.commit()
+    invalidate_identity(email)
     
     return {"message": "Account deleted successfully"}
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+class ActivitySample(BaseModel):
+    timestamp: datetime
+    steps: Optional[int] = Field(None, ge=0, le=65535)
+    heart_rate: Optional[int] = Field(None, ge=1, le=65535)
+
+class ActivitySamplesCreate(BaseModel):
+    samples: List[ActivitySample] = Field(..., min_length=1, max_length=20000)
+
+class ActivityIngestResponse(BaseModel):
+    accepted: int
+    days: int
+
+class ActivitySeriesResponse(BaseModel):
+    start: datetime
+    end: datetime
+    interval_seconds: int
+    steps: List[int]
+    heart_rate: List[Optional[int]]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class CalendarResponse(BaseModel):
+    year: int
+    days: int
+    adherence: List[Optional[float]]
+    active: List[int]
+    steps: List[int]
+    minutes: List[int]
+    mood: List[Optional[float]]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, date
 from typing import List, Optional
 
 class CircleCreate(BaseModel):
@@ -48,3 +48,37 @@ class MessageResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class MemberStreaks(BaseModel):
+    user_id: int
+    name: str
+    role: str
+    medication_streak: Optional[int] = None  # None when the member doesn't share adherence
+    fitness_streak: Optional[int] = None  # this and the _week fields: None unless they share activity
+    days_active_week: Optional[int] = None
+    steps_week: Optional[int] = None
+    minutes_week: Optional[int] = None
+    doses_taken_week: Optional[int] = None
+
+class CircleLeaderboardResponse(BaseModel):
+    circle_id: int
+    as_of: date
+    members: List[MemberStreaks]
+
+class WeeklyWellness(BaseModel):
+    week_start: date
+    member_count: int
+    mood_avg: Optional[float] = None
+    mood_members: int
+    adherence_pct: Optional[float] = None
+    adherence_members: int
+    active_days_avg: Optional[float] = None
+    activity_members: int
+    computed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class CircleWellnessResponse(BaseModel):
+    circle_id: int
+    weeks: List[WeeklyWellness]
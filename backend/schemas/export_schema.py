@@ -0,0 +1,58 @@
+from pydantic import BaseModel, Field
+from datetime import datetime, date, time
+from typing import Optional, List, Dict
+import enum
+
+class ExportStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+class ExportJobResponse(BaseModel):
+    id: int
+    status: ExportStatus
+    progress: int
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Archive records carry the same bounds as the columns they restore into,
+# so bad values are reported as row errors instead of failing the restore
+class JournalArchiveRecord(BaseModel):
+    id: int
+    content: str
+    sentiment_score: Optional[float] = Field(None, ge=-1, le=1)
+    emotion_label: Optional[str] = Field(None, max_length=50)
+    risk_flag: bool = False
+    created_at: Optional[datetime] = None
+
+class MedicationArchiveRecord(BaseModel):
+    id: int
+    name: str = Field(..., min_length=1, max_length=100)
+    dosage: Optional[str] = Field(None, max_length=50)
+    frequency_per_day: int = Field(1, ge=0, le=2147483647)
+    reminder_time: Optional[time] = None
+
+class MedicationLogArchiveRecord(BaseModel):
+    medication_id: int
+    taken_date: date
+    taken: bool = False
+
+class ImportTableResult(BaseModel):
+    imported: int
+    skipped: int
+    failed: int
+
+class AccountImportError(BaseModel):
+    file: str
+    row: int
+    error: str
+
+class AccountImportResponse(BaseModel):
+    tables: Dict[str, ImportTableResult]
+    errors: List[AccountImportError]
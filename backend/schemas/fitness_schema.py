@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import date
-from typing import Optional
+from typing import Optional, List
 import enum
 
 class Intensity(str, enum.Enum):
@@ -48,3 +48,24 @@ class MonthlyFitnessResponse(BaseModel):
     total_minutes: int
     days_active: int
     avg_daily_steps: float
+
+class FitnessRollupResponse(BaseModel):
+    granularity: str
+    start_date: date
+    end_date: date
+    periods: List[date]
+    steps: List[int]
+    minutes: List[int]
+    days_active: List[int]
+    logs: List[int]
+    avg_intensity: List[float]
+
+class FitnessImportError(BaseModel):
+    row: int
+    error: str
+
+class FitnessImportResponse(BaseModel):
+    imported: int
+    skipped: int
+    failed: int
+    errors: List[FitnessImportError]
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class InboxMessage(BaseModel):
+    id: int
+    circle_id: int
+    sender_id: int
+    receiver_id: int
+    message: str
+    created_at: datetime
+    read: bool
+
+class CircleUnread(BaseModel):
+    circle_id: int
+    unread: int
+
+class UnreadCounts(BaseModel):
+    total: int
+    circles: List[CircleUnread]
+
+class MarkReadRequest(BaseModel):
+    circle_id: int
+    up_to_id: Optional[int] = None
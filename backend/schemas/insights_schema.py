@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 class WeeklyInsightsResponse(BaseModel):
     avg_mood: float
@@ -6,3 +7,16 @@ class WeeklyInsightsResponse(BaseModel):
     medication_correlation: float
     predicted_next_mood: float
     summary: str
+
+class MoodSlot(BaseModel):
+    weekday: str
+    hour: int
+    avg_mood: float
+
+class MoodPatternsResponse(BaseModel):
+    utc_offset: str
+    weekdays: List[str]
+    total: int
+    counts: List[List[int]]
+    averages: List[List[Optional[float]]]
+    lowest: Optional[MoodSlot] = None
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, List, Dict
 
 class JournalCreate(BaseModel):
     content: str
@@ -21,7 +21,50 @@ class JournalResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class JournalSummaryResponse(BaseModel):
+    id: int
+    user_id: int
+    excerpt: str
+    truncated: bool
+    sentiment_score: Optional[float] = None
+    emotion_label: Optional[str] = None
+    risk_flag: bool
+    created_at: datetime
+
 class JournalAnalysisResponse(BaseModel):
     sentiment_score: float
     emotion_label: str
     risk_flag: bool
+
+class JournalSearchHit(BaseModel):
+    id: int
+    score: float
+    highlight: str
+    sentiment_score: Optional[float] = None
+    emotion_label: Optional[str] = None
+    risk_flag: bool
+    created_at: datetime
+
+class JournalSearchResponse(BaseModel):
+    total: int
+    page: int
+    limit: int
+    results: List[JournalSearchHit]
+
+class SentimentHistogram(BaseModel):
+    edges: List[float]
+    counts: List[int]
+
+class MoodSeries(BaseModel):
+    granularity: str
+    periods: List[date]
+    avg_mood: List[float]
+    entries: List[int]
+
+class JournalFacetsResponse(BaseModel):
+    start_date: date
+    end_date: date
+    total: int
+    emotions: Dict[str, int]
+    sentiment_histogram: SentimentHistogram
+    mood_series: MoodSeries
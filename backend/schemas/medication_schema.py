@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import time, date
 from typing import Optional, List
 
@@ -29,6 +29,18 @@ class MedicationTakenRequest(BaseModel):
     taken_date: date
     taken: bool = True
 
+class MedicationBulkTakenItem(BaseModel):
+    medication_id: int
+    taken_date: date
+    taken: bool = True
+
+class MedicationBulkTakenRequest(BaseModel):
+    entries: List[MedicationBulkTakenItem] = Field(..., min_length=1, max_length=1000)
+
+class MedicationBulkTakenResponse(BaseModel):
+    message: str
+    updated: int
+
 class MedicationSummaryResponse(BaseModel):
     current_streak: int
     weekly_adherence: float
@@ -21,6 +21,9 @@ class UserUpdate(BaseModel):
     age_range: Optional[str] = None
     primary_goal: Optional[PrimaryGoal] = None
     password: Optional[str] = None
+    share_mood: Optional[bool] = None
+    share_adherence: Optional[bool] = None
+    share_activity: Optional[bool] = None
 
 class UserLogin(BaseModel):
     email: EmailStr
@@ -32,6 +35,9 @@ class UserResponse(BaseModel):
     name: str
     age_range: Optional[str] = None
     primary_goal: PrimaryGoal
+    share_mood: bool = True
+    share_adherence: bool = True
+    share_activity: bool = True
     created_at: datetime
 
     class Config:
@@ -0,0 +1,50 @@
+import os
+import re
+import sys
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("EXPORT_DIR", os.path.join(_db_dir, "exports"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from app import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+
+def register(client, email):
+    """Register a user and return (user id, auth headers)"""
+    response = client.post("/api/auth/register", json={
+        "email": email, "password": "password", "name": "Test",
+        "age_range": "25-34", "primary_goal": "MOOD"
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return body["user"]["id"], {"Authorization": f"Bearer {body['token']}"}
+
+
+def _email(request, suffix=""):
+    # Parametrized test names contain brackets, which aren't valid in an address
+    return f"{re.sub(r'[^A-Za-z0-9_-]', '-', request.node.name)}{suffix}@example.com"
+
+
+@pytest.fixture
+def auth_headers(client, request):
+    return register(client, _email(request))[1]
+
+
+@pytest.fixture
+def make_user(client, request):
+    """Factory for extra users in a test: make_user("bob") -> (user id, auth headers)"""
+    return lambda name: register(client, _email(request, f"-{name}"))
@@ -0,0 +1,56 @@
+def _fitness_log(client, headers, log_date):
+    logs = client.get("/api/fitness", params={"start_date": log_date, "end_date": log_date}, headers=headers).json()
+    assert len(logs) == 1
+    return logs[0]
+
+
+def test_heart_rate_only_ingest_keeps_manual_steps(client, auth_headers):
+    response = client.post("/api/fitness", json={
+        "log_date": "2026-02-23", "activity_completed": True,
+        "steps": 8000, "minutes_exercised": 45, "intensity": "HIGH"
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    response = client.post("/api/activity/samples", json={"samples": [
+        {"timestamp": "2026-02-23T07:30:00Z", "heart_rate": 104},
+        {"timestamp": "2026-02-23T07:31:00Z", "heart_rate": 101}
+    ]}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    log = _fitness_log(client, auth_headers, "2026-02-23")
+    assert log["steps"] == 8000
+    assert log["minutes_exercised"] == 45
+    assert log["intensity"] == "HIGH"
+
+
+def test_step_samples_update_fitness_log(client, auth_headers):
+    response = client.post("/api/activity/samples", json={"samples": [
+        {"timestamp": "2026-02-24T07:30:00Z", "steps": 120, "heart_rate": 104},
+        {"timestamp": "2026-02-24T07:31:00Z", "steps": 80}
+    ]}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    log = _fitness_log(client, auth_headers, "2026-02-24")
+    assert log["steps"] == 200
+    assert log["minutes_exercised"] == 1
+
+
+def test_ingests_for_the_same_day_merge(client, auth_headers):
+    for minute, steps in ((0, 50), (1, 70)):
+        response = client.post("/api/activity/samples", json={"samples": [
+            {"timestamp": f"2026-02-25T07:{minute:02d}:00Z", "steps": steps}
+        ]}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+
+    series = client.get("/api/activity/samples", params={
+        "start": "2026-02-25T07:00:00", "end": "2026-02-25T07:02:00"
+    }, headers=auth_headers).json()
+    assert series["steps"] == [50, 70]
+    assert _fitness_log(client, auth_headers, "2026-02-25")["steps"] == 120
+
+
+def test_ingest_rejects_samples_spanning_too_many_days(client, auth_headers):
+    response = client.post("/api/activity/samples", json={"samples": [
+        {"timestamp": f"2026-03-{day:02d}T12:00:00Z", "steps": 10} for day in range(1, 16)
+    ]}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,93 @@
+import io
+import json
+import zipfile
+
+from utils.account_export import ARCHIVE_VERSION
+
+
+def _archive(members: dict) -> bytes:
+    """Zip NDJSON members given as lists of records (or raw bytes)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("manifest.json", json.dumps({"version": ARCHIVE_VERSION}))
+        for name, rows in members.items():
+            data = rows if isinstance(rows, bytes) else "".join(json.dumps(row) + "\n" for row in rows).encode()
+            archive.writestr(f"{name}.ndjson", data)
+    return buffer.getvalue()
+
+
+def _restore(client, headers, data: bytes):
+    return client.post("/api/export/import", files={"file": ("export.zip", data, "application/zip")}, headers=headers)
+
+
+def test_export_archive_restores_into_another_account(client, make_user):
+    _, source = make_user("source")
+    _, target = make_user("target")
+    medication_id = client.post("/api/medications", json={"name": "Vitamin D"}, headers=source).json()["id"]
+    client.post(f"/api/medications/{medication_id}/taken", json={"taken_date": "2026-02-23"}, headers=source)
+    client.post("/api/journal", json={"content": "A calm and happy day"}, headers=source)
+    client.post("/api/fitness", json={"log_date": "2026-02-23", "steps": 8000}, headers=source)
+
+    job = client.post("/api/export/jobs", headers=source).json()
+    assert client.get(f"/api/export/jobs/{job['id']}", headers=source).json()["status"] == "COMPLETED"
+    archive = client.get(f"/api/export/jobs/{job['id']}/download", headers=source).content
+
+    response = _restore(client, target, archive)
+    assert response.status_code == 200, response.text
+    tables = response.json()["tables"]
+    assert {name: counts["imported"] for name, counts in tables.items()} == {
+        "medications": 1, "medication_logs": 1, "journal": 1, "fitness": 1
+    }
+    assert response.json()["errors"] == []
+
+    medications = client.get("/api/medications", headers=target).json()
+    assert [m["name"] for m in medications] == ["Vitamin D"]
+    assert medications[0]["id"] != medication_id
+    journal = client.get("/api/journal", headers=target).json()
+    assert [j["content"] for j in journal] == ["A calm and happy day"]
+
+
+def test_invalid_rows_are_reported_and_the_rest_restored(client, auth_headers):
+    data = _archive({
+        "medications": [
+            {"id": 1, "name": "Vitamin D"},
+            {"id": 2, "name": "x" * 101},
+        ],
+        "medication_logs": [
+            {"medication_id": 1, "taken_date": "2026-02-23", "taken": True},
+            {"medication_id": 2, "taken_date": "2026-02-23", "taken": True},
+        ],
+        "journal": [
+            {"id": 1, "content": "Fine", "sentiment_score": 0.5},
+            {"id": 2, "content": "Too sure", "sentiment_score": 5},
+        ],
+        "fitness": b'{"log_date": "2026-02-23"}\nnot json\n',
+    })
+
+    response = _restore(client, auth_headers, data)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["tables"] == {
+        "medications": {"imported": 1, "skipped": 0, "failed": 1},
+        "medication_logs": {"imported": 1, "skipped": 1, "failed": 0},
+        "journal": {"imported": 1, "skipped": 0, "failed": 1},
+        "fitness": {"imported": 1, "skipped": 0, "failed": 1},
+    }
+    assert [(e["file"], e["row"]) for e in body["errors"]] == [
+        ("medications.ndjson", 2), ("journal.ndjson", 2), ("fitness.ndjson", 2)
+    ]
+
+
+def test_unreadable_member_restores_nothing(client, auth_headers):
+    data = _archive({
+        "medications": [{"id": 1, "name": "Vitamin D"}],
+        "journal": b'{"id": 1, "content": "\xff"}\n',
+    })
+
+    response = _restore(client, auth_headers, data)
+    assert response.status_code == 400
+    assert client.get("/api/medications", headers=auth_headers).json() == []
+
+
+def test_not_an_archive(client, auth_headers):
+    assert _restore(client, auth_headers, b"not a zip").status_code == 400
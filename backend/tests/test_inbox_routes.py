@@ -0,0 +1,74 @@
+def _circle_with_members(client, make_user):
+    owner_id, owner = make_user("owner")
+    member_id, member = make_user("member")
+    circle_id = client.post("/api/circles", json={"name": "Inbox"}, headers=owner).json()["id"]
+    assert client.post(f"/api/circles/{circle_id}/join", headers=member).status_code == 200
+    return circle_id, (owner_id, owner), (member_id, member)
+
+
+def _unread(client, headers, circle_id):
+    counts = client.get("/api/inbox/unread", headers=headers).json()
+    return {c["circle_id"]: c["unread"] for c in counts["circles"]}.get(circle_id, 0)
+
+
+def _send(client, headers, circle_id, receiver_id, text="Keep going!"):
+    return client.post(f"/api/circles/{circle_id}/message", json={
+        "receiver_id": receiver_id, "message": text
+    }, headers=headers)
+
+
+def test_message_counts_as_unread_until_marked_read(client, make_user):
+    circle_id, (owner_id, owner), (member_id, member) = _circle_with_members(client, make_user)
+
+    first = _send(client, owner, circle_id, member_id).json()
+    second = _send(client, owner, circle_id, member_id).json()
+    assert _unread(client, member, circle_id) == 2
+    assert _unread(client, owner, circle_id) == 0
+
+    response = client.post("/api/inbox/read", json={"circle_id": circle_id, "up_to_id": first["id"]}, headers=member)
+    assert response.json() == {"circle_id": circle_id, "unread": 1}
+    inbox = client.get("/api/inbox", params={"circle_id": circle_id}, headers=member).json()
+    assert {m["id"]: m["read"] for m in inbox} == {first["id"]: True, second["id"]: False}
+
+    response = client.post("/api/inbox/read", json={"circle_id": circle_id}, headers=member)
+    assert response.json()["unread"] == 0
+    assert _unread(client, member, circle_id) == 0
+
+
+def test_messages_to_self_are_never_unread(client, make_user):
+    circle_id, (owner_id, owner), _ = _circle_with_members(client, make_user)
+
+    assert _send(client, owner, circle_id, owner_id).status_code == 200
+    assert _unread(client, owner, circle_id) == 0
+
+
+def test_receiver_must_be_a_circle_member(client, make_user):
+    circle_id, (owner_id, owner), _ = _circle_with_members(client, make_user)
+    outsider_id, outsider = make_user("outsider")
+
+    assert _send(client, owner, circle_id, outsider_id).status_code == 400
+    assert _send(client, owner, circle_id, 99999).status_code == 400
+    assert client.get("/api/inbox", headers=outsider).json() == []
+    assert _unread(client, outsider, circle_id) == 0
+
+
+def test_only_members_can_mark_a_circle_read(client, make_user):
+    circle_id, (owner_id, owner), (member_id, member) = _circle_with_members(client, make_user)
+    _, outsider = make_user("outsider")
+
+    response = client.post("/api/inbox/read", json={"circle_id": circle_id}, headers=outsider)
+    assert response.status_code == 403
+    response = client.post("/api/inbox/read", json={"circle_id": 99999}, headers=member)
+    assert response.status_code == 404
+
+
+def test_leaving_a_circle_clears_its_unread_count(client, make_user):
+    circle_id, (owner_id, owner), (member_id, member) = _circle_with_members(client, make_user)
+
+    _send(client, owner, circle_id, member_id)
+    assert _unread(client, member, circle_id) == 1
+    assert client.post(f"/api/circles/{circle_id}/leave", headers=member).status_code == 200
+
+    assert _unread(client, member, circle_id) == 0
+    response = client.post("/api/inbox/read", json={"circle_id": circle_id}, headers=member)
+    assert response.status_code == 403
@@ -0,0 +1,64 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from database import SessionLocal
+from models.journal_model import JournalEntry
+
+
+def _add_entries(user_id, *created_ats, score="0.5"):
+    with SessionLocal() as db:
+        db.add_all([
+            JournalEntry(user_id=user_id, content="Entry", sentiment_score=Decimal(score), created_at=created_at)
+            for created_at in created_ats
+        ])
+        db.commit()
+
+
+def _slots(patterns):
+    """(weekday, hour) of every non-empty slot"""
+    return {
+        (patterns["weekdays"][d], h)
+        for d, row in enumerate(patterns["counts"]) for h, count in enumerate(row) if count
+    }
+
+
+@pytest.mark.parametrize("utc_offset, expected", [
+    ("0", {("Mon", 18)}),
+    ("5", {("Mon", 23)}),
+    ("+05:30", {("Tue", 0)}),
+    ("+05:45", {("Tue", 0)}),
+    ("-03:00", {("Mon", 15)}),
+    ("-09:30", {("Mon", 9)}),
+])
+def test_patterns_shift_by_quarter_hour_offsets(client, make_user, utc_offset, expected):
+    user_id, headers = make_user("writer")
+    # Monday 18:40 UTC
+    _add_entries(user_id, datetime(2026, 2, 23, 18, 40))
+
+    response = client.get("/api/insights/mood-patterns", params={"utc_offset": utc_offset}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert _slots(response.json()) == expected
+
+
+def test_cached_totals_match_the_aggregate(client, make_user):
+    user_id, headers = make_user("writer")
+    _add_entries(user_id, datetime(2026, 2, 23, 18, 40), datetime(2026, 2, 23, 18, 10))
+    params = {"utc_offset": "+05:30"}
+    before = client.get("/api/insights/mood-patterns", params=params, headers=headers).json()
+
+    # A new entry builds the cache from every entry, then later ones are added to it
+    client.post("/api/journal", json={"content": "Feeling good"}, headers=headers)
+    client.post("/api/journal", json={"content": "Feeling good again"}, headers=headers)
+    after = client.get("/api/insights/mood-patterns", params=params, headers=headers).json()
+
+    assert after["utc_offset"] == "+05:30"
+    assert after["total"] == before["total"] + 2
+    assert {("Mon", 23), ("Tue", 0)} <= _slots(after)
+
+
+@pytest.mark.parametrize("utc_offset, status", [("+05:20", 400), ("+15:00", 400), ("-12:30", 400), ("IST", 422)])
+def test_invalid_offsets_are_rejected(client, auth_headers, utc_offset, status):
+    response = client.get("/api/insights/mood-patterns", params={"utc_offset": utc_offset}, headers=auth_headers)
+    assert response.status_code == status
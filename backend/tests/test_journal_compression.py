@@ -0,0 +1,66 @@
+from sqlalchemy import LargeBinary, type_coerce
+
+from database import SessionLocal
+from models.journal_model import JournalEntry
+from utils import compression
+from utils.compression import ZLIB_MARKER, compress_text, decompress_text, migrate_journal_content
+
+LONG_TEXT = "Slept badly, but the walk at lunch helped a lot. " * 40
+
+
+def _stored(entry_id):
+    with SessionLocal() as db:
+        return bytes(db.query(type_coerce(JournalEntry.content, LargeBinary)).filter(
+            JournalEntry.id == entry_id
+        ).scalar())
+
+
+def _create(client, headers, content):
+    assert client.post("/api/journal", json={"content": content}, headers=headers).status_code == 200
+    return client.get("/api/journal", params={"limit": 1}, headers=headers).json()[0]["id"]
+
+
+def test_compress_round_trip():
+    packed = compress_text(LONG_TEXT, enabled=True, min_bytes=100)
+    assert packed.startswith(ZLIB_MARKER)
+    assert len(packed) < len(LONG_TEXT)
+    assert decompress_text(packed) == LONG_TEXT
+
+
+def test_short_or_disabled_text_is_stored_plain():
+    assert compress_text("Good day", enabled=True, min_bytes=100) == b"Good day"
+    assert compress_text(LONG_TEXT, enabled=False) == LONG_TEXT.encode()
+
+
+def test_text_starting_with_nul_is_always_compressed():
+    text = "\x00z2:not really compressed"
+    packed = compress_text(text, enabled=False)
+    assert packed.startswith(ZLIB_MARKER)
+    assert decompress_text(packed) == text
+
+
+def test_entries_round_trip_and_keep_excerpts_current(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(compression, "JOURNAL_COMPRESSION", True)
+    monkeypatch.setattr(compression, "JOURNAL_COMPRESS_MIN_BYTES", 100)
+
+    entry_id = _create(client, auth_headers, LONG_TEXT)
+    assert _stored(entry_id).startswith(ZLIB_MARKER)
+    assert client.get(f"/api/journal/{entry_id}", headers=auth_headers).json()["content"] == LONG_TEXT
+
+    response = client.put(f"/api/journal/{entry_id}", json={"content": "Short and sweet"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert _stored(entry_id) == b"Short and sweet"
+
+    summaries = client.get("/api/journal", params={"view": "summary"}, headers=auth_headers).json()
+    assert [(s["excerpt"], s["truncated"]) for s in summaries] == [("Short and sweet", False)]
+
+
+def test_migration_rewrites_rows_in_the_configured_format(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(compression, "JOURNAL_COMPRESS_MIN_BYTES", 100)
+    monkeypatch.setattr(compression, "JOURNAL_COMPRESSION", True)
+    entry_id = _create(client, auth_headers, LONG_TEXT)
+
+    monkeypatch.setattr(compression, "JOURNAL_COMPRESSION", False)
+    with SessionLocal() as db:
+        assert migrate_journal_content(db, batch_size=2) >= 1
+    assert _stored(entry_id) == LONG_TEXT.encode()
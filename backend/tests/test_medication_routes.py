@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+from database import SessionLocal
+from utils.adherence import adherence_streak
+
+
+def _medication(client, headers, name="Vitamin D", frequency_per_day=1):
+    response = client.post("/api/medications", json={
+        "name": name, "dosage": "10mg", "frequency_per_day": frequency_per_day
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _take(client, headers, entries):
+    response = client.post("/api/medications/taken/bulk", json={"entries": [
+        {"medication_id": medication_id, "taken_date": str(day), "taken": taken}
+        for medication_id, day, taken in entries
+    ]}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def _summary(client, headers):
+    return client.get("/api/medications/summary", headers=headers).json()
+
+
+def test_streak_counts_days_every_medication_was_taken(client, auth_headers):
+    today = date.today()
+    morning = _medication(client, auth_headers, "Morning")
+    evening = _medication(client, auth_headers, "Evening")
+    _take(client, auth_headers, [(morning, today - timedelta(days=i), True) for i in range(4)])
+    _take(client, auth_headers, [(evening, today - timedelta(days=i), True) for i in range(2)])
+
+    summary = _summary(client, auth_headers)
+    assert summary["current_streak"] == 2
+    # 6 of 14 scheduled doses over the last week
+    assert summary["weekly_adherence"] == 42.86
+
+
+def test_untaking_a_dose_clears_its_day(client, auth_headers):
+    today = date.today()
+    medication_id = _medication(client, auth_headers)
+    _take(client, auth_headers, [(medication_id, today - timedelta(days=i), True) for i in range(3)])
+    assert _summary(client, auth_headers)["current_streak"] == 3
+
+    response = client.post(f"/api/medications/{medication_id}/taken", json={
+        "taken_date": str(today - timedelta(days=1)), "taken": False
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert _summary(client, auth_headers)["current_streak"] == 1
+
+
+def test_streak_continues_across_years(client, auth_headers):
+    medication_id = _medication(client, auth_headers)
+    first = date(2025, 12, 29)
+    _take(client, auth_headers, [(medication_id, first + timedelta(days=i), True) for i in range(5)])
+
+    with SessionLocal() as db:
+        assert adherence_streak(db, [medication_id], date(2026, 1, 2)) == 5
+        assert adherence_streak(db, [medication_id], date(2026, 1, 3)) == 0
+
+
+def test_weekly_insights_with_zero_frequency_medication(client, auth_headers):
+    medication_id = _medication(client, auth_headers, frequency_per_day=0)
+    _take(client, auth_headers, [(medication_id, date.today(), True)])
+
+    response = client.get("/api/insights/weekly", headers=auth_headers)
+    assert response.status_code == 200, response.text
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+
+from database import SessionLocal
+from models.journal_model import JournalEntry
+from utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, encode_cursor
+
+
+def _pages(client, headers, url, limit, **params):
+    """Follow X-Next-Cursor to the end and return the pages' ids"""
+    pages = []
+    cursor = None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=query, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_medication_pages_follow_the_cursor_in_id_order(client, auth_headers):
+    ids = [
+        client.post("/api/medications", json={"name": f"Med {i}"}, headers=auth_headers).json()["id"]
+        for i in range(5)
+    ]
+
+    assert _pages(client, auth_headers, "/api/medications", 2) == [ids[:2], ids[2:4], ids[4:]]
+    response = client.get("/api/medications", params={"include_total": True, "limit": 2}, headers=auth_headers)
+    assert response.headers[TOTAL_COUNT_HEADER] == "5"
+
+
+def test_journal_pages_break_created_at_ties_by_id(client, make_user):
+    user_id, headers = make_user("writer")
+    same_time = datetime(2026, 2, 23, 10, 0)
+    with SessionLocal() as db:
+        entries = [
+            JournalEntry(user_id=user_id, content=f"Entry {i}", created_at=same_time)
+            for i in range(4)
+        ]
+        entries.append(JournalEntry(user_id=user_id, content="Newest", created_at=datetime(2026, 2, 24)))
+        db.add_all(entries)
+        db.commit()
+        ids = [entry.id for entry in entries]
+
+    pages = _pages(client, headers, "/api/journal", 2, view="summary")
+    assert pages == [[ids[4], ids[3]], [ids[2], ids[1]], [ids[0]]]
+
+
+def test_cursor_skips_rows_added_before_it(client, auth_headers):
+    first = [
+        client.post("/api/medications", json={"name": f"Med {i}"}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+    response = client.get("/api/medications", params={"limit": 2}, headers=auth_headers)
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    added = client.post("/api/medications", json={"name": "Late"}, headers=auth_headers).json()["id"]
+
+    response = client.get("/api/medications", params={"limit": 2, "cursor": cursor}, headers=auth_headers)
+    assert [m["id"] for m in response.json()] == [first[2], added]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["x"]), encode_cursor([1, 2, 3]), "bnVsbA"])
+def test_bad_cursor_is_rejected(client, auth_headers, cursor):
+    response = client.get("/api/journal", params={"cursor": cursor}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
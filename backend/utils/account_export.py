@@ -0,0 +1,156 @@
+"""
+Full-account export archives
+
+An export job writes one zip to EXPORT_DIR: a manifest plus one NDJSON
+file per table, each line holding a row's columns. Tables are read in
+keyset batches and written through zipfile's streaming member writer, so
+the archive never has to fit in memory. Jobs run after the request
+that queued them has returned and save their progress on the job row.
+"""
+
+import json
+import os
+import zipfile
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from config import EXPORT_DIR
+from database import SessionLocal
+from models.export_job_model import ExportJob, ExportStatus
+from models.journal_model import JournalEntry
+from models.medication_model import Medication
+from models.medication_log_model import MedicationLog
+from models.fitness_log_model import FitnessLog
+from models.message_model import EncouragementMessage
+from utils.export import CHUNK_ROWS, ndjson_lines
+
+ARCHIVE_VERSION = 1
+
+# A job still pending or running after this long is assumed lost (e.g. to a restart)
+JOB_TIMEOUT = timedelta(hours=1)
+
+
+def _columns(model, skip=()):
+    return [getattr(model, column.key) for column in model.__table__.columns if column.key not in skip]
+
+
+def export_tables(user_id: int) -> list:
+    """(archive member, columns, filter) for every table in an account export"""
+    return [
+        # excerpt is derived from content on import
+        ("journal", _columns(JournalEntry, skip=("excerpt",)), JournalEntry.user_id == user_id),
+        ("medications", _columns(Medication), Medication.user_id == user_id),
+        ("medication_logs", _columns(MedicationLog), MedicationLog.user_id == user_id),
+        ("fitness", _columns(FitnessLog), FitnessLog.user_id == user_id),
+        ("circle_messages", _columns(EncouragementMessage), or_(
+            EncouragementMessage.sender_id == user_id,
+            EncouragementMessage.receiver_id == user_id
+        )),
+    ]
+
+
+def export_path(job_id: int) -> str:
+    return os.path.join(EXPORT_DIR, f"account-export-{job_id}.zip")
+
+
+def active_job(db: Session, user_id: int):
+    """The user's pending or running job, unless it has been stuck past JOB_TIMEOUT"""
+    return db.query(ExportJob).filter(
+        ExportJob.user_id == user_id,
+        ExportJob.status.in_([ExportStatus.PENDING, ExportStatus.RUNNING]),
+        ExportJob.created_at >= datetime.utcnow() - JOB_TIMEOUT
+    ).first()
+
+
+def purge_exports(db: Session, user_id: int):
+    """Delete the user's export jobs and their archives. The caller commits."""
+    jobs = db.query(ExportJob).filter(ExportJob.user_id == user_id).all()
+    for job in jobs:
+        for path in (export_path(job.id), export_path(job.id) + ".part"):
+            if os.path.exists(path):
+                os.remove(path)
+        db.delete(job)
+
+
+def _batches(db: Session, columns: list, condition):
+    """
+    Yield rows in id order, CHUNK_ROWS at a time. Each batch is its own
+    short read, so no cursor or transaction stays open while progress is
+    saved (SQLite would block the update behind it).
+    """
+    id_column = columns[0]
+    last_id = 0
+    while True:
+        rows = db.query(*columns).filter(condition, id_column > last_id).order_by(id_column).limit(CHUNK_ROWS).all()
+        db.rollback()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _save_progress(db: Session, job: ExportJob, done: int, total: int):
+    # 100 is reserved for the finished archive
+    percent = min(99, done * 100 // total) if total else 99
+    if percent != job.progress:
+        job.progress = percent
+        db.commit()
+
+
+def run_export_job(job_id: int):
+    """Write the archive for a queued job, recording progress and the outcome on the job row"""
+    status_db = SessionLocal()
+    db = SessionLocal()
+    partial = export_path(job_id) + ".part"
+    try:
+        job = status_db.get(ExportJob, job_id)
+        if job is None:
+            return
+        job.status = ExportStatus.RUNNING
+        status_db.commit()
+
+        tables = export_tables(job.user_id)
+        counts = {
+            name: db.query(func.count()).select_from(columns[0].class_).filter(condition).scalar()
+            for name, columns, condition in tables
+        }
+        db.rollback()
+        total = sum(counts.values())
+        done = 0
+
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("manifest.json", json.dumps({
+                "version": ARCHIVE_VERSION,
+                "user_id": job.user_id,
+                "created_at": datetime.utcnow().isoformat(),
+                "counts": counts
+            }, indent=2))
+
+            for name, columns, condition in tables:
+                with archive.open(f"{name}.ndjson", "w") as member:
+                    for rows in _batches(db, columns, condition):
+                        for chunk in ndjson_lines(row._asdict() for row in rows):
+                            member.write(chunk.encode("utf-8"))
+                        done += len(rows)
+                        _save_progress(status_db, job, done, total)
+
+        os.replace(partial, export_path(job_id))
+        job.status = ExportStatus.COMPLETED
+        job.progress = 100
+        job.file_size = os.path.getsize(export_path(job_id))
+        job.completed_at = datetime.utcnow()
+        status_db.commit()
+    except Exception as e:
+        status_db.rollback()
+        if os.path.exists(partial):
+            os.remove(partial)
+        job = status_db.get(ExportJob, job_id)
+        if job is not None:
+            job.status = ExportStatus.FAILED
+            job.error = str(e)[:255]
+            job.completed_at = datetime.utcnow()
+            status_db.commit()
+    finally:
+        db.close()
+        status_db.close()
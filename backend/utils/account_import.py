@@ -0,0 +1,225 @@
+"""
+Account restore from export archives
+
+Reads an archive written by utils.account_export one NDJSON line at a
+time. Records are validated and inserted in chunks (utils.chunked_import),
+all in one transaction: a restore that fails partway, on an unreadable
+member or a database error, leaves the account untouched. Restored rows
+get new ids, and medication logs are remapped to the
+new medication ids. Sentiment, emotion and risk flags come from the
+archive instead of being recomputed.
+
+Circle messages are not restored: circles and their members belong to the
+deployment the archive came from.
+"""
+
+import io
+import json
+import zipfile
+import zlib
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy.exc import DBAPIError, DataError, IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from models.journal_model import JournalEntry
+from models.medication_model import Medication
+from models.fitness_log_model import FitnessLog, Intensity
+from schemas.export_schema import JournalArchiveRecord, MedicationArchiveRecord, MedicationLogArchiveRecord
+from schemas.fitness_schema import FitnessCreate
+from ml.patterns import invalidate_mood_patterns
+from utils.account_export import ARCHIVE_VERSION
+from utils.adherence import record_doses
+from utils.bulk import upsert_rows
+from utils.chunked_import import import_records
+from utils.leaderboard import invalidate_member_leaderboards
+from utils.search import index_new_entries
+
+# Driver errors that mean another transaction got in the way, not bad data:
+# MySQL deadlock / lock wait timeout, PostgreSQL serialization failure / deadlock
+_LOCK_ERROR_CODES = {1205, 1213}
+_LOCK_SQLSTATES = {"40001", "40P01"}
+
+
+def _archive_records(archive: zipfile.ZipFile, name: str):
+    """Yield (row_number, record) pairs from an NDJSON member, if present"""
+    if name not in archive.namelist():
+        return
+    with archive.open(name) as member:
+        for row_number, line in enumerate(io.TextIOWrapper(member, encoding="utf-8"), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, e
+
+
+def _is_lock_conflict(error: DBAPIError) -> bool:
+    orig = error.orig
+    if (getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)) in _LOCK_SQLSTATES:
+        return True
+    if orig is not None and orig.args and orig.args[0] in _LOCK_ERROR_CODES:
+        return True
+    return isinstance(error, OperationalError) and "database is locked" in str(orig)
+
+
+class _Restore:
+    def __init__(self, db: Session, user_id: int, archive: zipfile.ZipFile):
+        self.db = db
+        self.user_id = user_id
+        self.archive = archive
+        self.medication_ids = {}  # archive id -> new id
+        self.tables = {}
+        self.errors = []
+
+    def table(self, name: str, schema, insert_chunk):
+        """Validate one archive member and pass it to insert_chunk in chunks"""
+        file = f"{name}.ndjson"
+        self.tables[name] = import_records(
+            _archive_records(self.archive, file), schema, insert_chunk,
+            self.errors, lambda row, error: {"file": file, "row": row, "error": error}
+        )
+
+    def medications(self, chunk: list) -> int:
+        medications = [
+            Medication(
+                user_id=self.user_id,
+                name=record.name,
+                dosage=record.dosage,
+                frequency_per_day=record.frequency_per_day,
+                reminder_time=record.reminder_time
+            )
+            for record in chunk
+        ]
+        self.db.add_all(medications)
+        self.db.flush()
+        for record, medication in zip(chunk, medications):
+            self.medication_ids[record.id] = medication.id
+        return len(medications)
+
+    def medication_logs(self, chunk: list) -> int:
+        # Logs of medications that weren't restored are skipped, as are repeated dates
+        rows = {}
+        for record in chunk:
+            medication_id = self.medication_ids.get(record.medication_id)
+            if medication_id is not None:
+                rows[(medication_id, record.taken_date)] = {
+                    "medication_id": medication_id,
+                    "user_id": self.user_id,
+                    "taken_date": record.taken_date,
+                    "taken": record.taken
+                }
+        return record_doses(self.db, list(rows.values()))
+
+    def journal(self, chunk: list) -> int:
+        entries = [
+            JournalEntry(
+                user_id=self.user_id,
+                content=record.content,
+                sentiment_score=record.sentiment_score,
+                emotion_label=record.emotion_label,
+                risk_flag=record.risk_flag,
+                created_at=record.created_at or datetime.utcnow()
+            )
+            for record in chunk
+        ]
+        self.db.add_all(entries)
+        self.db.flush()
+        index_new_entries(self.db, entries)
+        invalidate_mood_patterns(self.db, self.user_id)
+        return len(entries)
+
+    def fitness(self, chunk: list) -> int:
+        # Days the account already has a log for are kept as they are
+        dates = {record.log_date for record in chunk}
+        existing = {
+            row.log_date for row in self.db.query(FitnessLog.log_date).filter(
+                FitnessLog.user_id == self.user_id,
+                FitnessLog.log_date.in_(dates)
+            )
+        }
+
+        rows = []
+        for record in chunk:
+            if record.log_date in existing:
+                continue
+            existing.add(record.log_date)
+            rows.append({
+                "user_id": self.user_id,
+                "log_date": record.log_date,
+                "activity_completed": record.activity_completed,
+                "steps": record.steps,
+                "minutes_exercised": record.minutes_exercised,
+                "intensity": Intensity[record.intensity.value]
+            })
+        upsert_rows(
+            self.db, FitnessLog, rows,
+            index_elements=["user_id", "log_date"],
+            update_columns=[]
+        )
+        return len(rows)
+
+
+def restore_archive(db: Session, user_id: int, file) -> dict:
+    """
+    Add the contents of an export archive to a user's account, all or
+    nothing. Returns per-table imported/skipped/failed counts and the
+    first row errors.
+    Restoring the same archive twice duplicates journal entries and
+    medications.
+    """
+    try:
+        archive = zipfile.ZipFile(file)
+        manifest = json.loads(archive.read("manifest.json"))
+    except (zipfile.BadZipFile, KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Not an export archive")
+    if manifest.get("version") != ARCHIVE_VERSION:
+        raise HTTPException(status_code=400, detail=f"Unsupported archive version: {manifest.get('version')}")
+
+    restore = _Restore(db, user_id, archive)
+    try:
+        with archive:
+            # Medications first so their logs can be remapped
+            restore.table("medications", MedicationArchiveRecord, restore.medications)
+            restore.table("medication_logs", MedicationLogArchiveRecord, restore.medication_logs)
+            restore.table("journal", JournalArchiveRecord, restore.journal)
+            restore.table("fitness", FitnessCreate, restore.fitness)
+        invalidate_member_leaderboards(db, user_id)
+        db.commit()
+    except (UnicodeDecodeError, zipfile.BadZipFile, zlib.error) as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Could not read archive, nothing was restored: {e}")
+    except DBAPIError as e:
+        db.rollback()
+        if _is_lock_conflict(e):
+            raise HTTPException(
+                status_code=409,
+                detail="Restore conflicted with other changes to the account, nothing was restored; try again"
+            )
+        if isinstance(e, (DataError, IntegrityError)):
+            raise HTTPException(
+                status_code=400,
+                detail=f"The database rejected a value in the archive, nothing was restored: {e.orig}"
+            )
+        raise
+
+    return {"tables": restore.tables, "errors": restore.errors}
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Restore an account export archive into a user's account")
+    parser.add_argument("archive", help="Path to the export zip")
+    parser.add_argument("--user-id", type=int, required=True)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        with open(args.archive, "rb") as f:
+            result = restore_archive(db, args.user_id, f)
+        print(json.dumps(result, indent=2))
+    finally:
+        db.close()
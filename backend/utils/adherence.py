@@ -0,0 +1,200 @@
+"""
+Medication adherence bitmaps
+
+Each medication keeps one bitmap per calendar year in medication_adherence,
+where bit N is set when the medication was taken on day-of-year N+1. The
+bitmaps are written alongside medication_logs by record_doses, so summaries
+read a few bytes per medication instead of scanning every log row.
+"""
+
+from sqlalchemy.orm import Session
+from models.medication_log_model import MedicationLog
+from models.medication_adherence_model import MedicationAdherence
+from utils.bulk import upsert_rows
+from datetime import date, timedelta
+
+BITMAP_BYTES = 46  # 366 days rounded up to whole bytes
+
+
+def day_index(day: date) -> int:
+    return day.timetuple().tm_yday - 1
+
+
+def to_bits(data: bytes) -> int:
+    return int.from_bytes(data or b"", "little")
+
+
+def from_bits(bits: int) -> bytes:
+    return bits.to_bytes(BITMAP_BYTES, "little")
+
+
+def record_doses(db: Session, rows: list):
+    """
+    Upsert medication_logs rows and apply the same taken/not-taken
+    changes to the adherence bitmaps. Rows are dicts with medication_id,
+    user_id, taken_date and taken. The caller commits.
+    """
+    if not rows:
+        return 0
+
+    upsert_rows(
+        db, MedicationLog, rows,
+        index_elements=["medication_id", "taken_date"],
+        update_columns=["taken"]
+    )
+
+    owners = {(row["medication_id"], row["taken_date"].year): row["user_id"] for row in rows}
+
+    # Make sure every bitmap row exists before locking, so concurrent first
+    # doses for a medication-year serialize on the row lock instead of both
+    # seeing no row and one update being lost
+    upsert_rows(
+        db, MedicationAdherence,
+        [
+            {"medication_id": medication_id, "user_id": user_id, "year": year, "days": from_bits(0)}
+            for (medication_id, year), user_id in owners.items()
+        ],
+        index_elements=["medication_id", "year"],
+        update_columns=[]
+    )
+
+    medication_ids = {medication_id for medication_id, _ in owners}
+    years = {year for _, year in owners}
+    locked = db.query(MedicationAdherence).filter(
+        MedicationAdherence.medication_id.in_(medication_ids),
+        MedicationAdherence.year.in_(years)
+    ).with_for_update().populate_existing().all()
+
+    bitmaps = {(b.medication_id, b.year): to_bits(b.days) for b in locked}
+    for row in rows:
+        key = (row["medication_id"], row["taken_date"].year)
+        bit = 1 << day_index(row["taken_date"])
+        bits = bitmaps[key]
+        bitmaps[key] = bits | bit if row["taken"] else bits & ~bit
+
+    for bitmap in locked:
+        key = (bitmap.medication_id, bitmap.year)
+        if key in owners:
+            bitmap.days = from_bits(bitmaps[key])
+    db.flush()
+    return len(rows)
+
+
+def load_adherence(db: Session, medication_ids: list, start_date: date, end_date: date) -> dict:
+    """
+    Return {medication_id: bits} for the inclusive date range, where bit 0
+    is start_date and bit N is start_date + N days. One query regardless of
+    the range length.
+    """
+    result = {medication_id: 0 for medication_id in medication_ids}
+    if not medication_ids or start_date > end_date:
+        return result
+
+    bitmaps = db.query(
+        MedicationAdherence.medication_id,
+        MedicationAdherence.year,
+        MedicationAdherence.days
+    ).filter(
+        MedicationAdherence.medication_id.in_(medication_ids),
+        MedicationAdherence.year >= start_date.year,
+        MedicationAdherence.year <= end_date.year
+    ).all()
+
+    for medication_id, year, days in bitmaps:
+        first = max(start_date, date(year, 1, 1))
+        last = min(end_date, date(year, 12, 31))
+        length = (last - first).days + 1
+        window = (to_bits(days) >> day_index(first)) & ((1 << length) - 1)
+        result[medication_id] |= window << (first - start_date).days
+    return result
+
+
+def daily_taken_counts(bitmaps: dict, days: int) -> list:
+    """Number of medications taken on each day of a load_adherence window"""
+    return [
+        sum((bits >> i) & 1 for bits in bitmaps.values())
+        for i in range(days)
+    ]
+
+
+def adherence_streak(db: Session, medication_ids: list, today: date) -> int:
+    """
+    Count consecutive days ending today on which every medication was
+    taken. Reads one year of bitmaps at a time, walking back only while
+    the streak covers the whole year loaded so far.
+    """
+    return adherence_streaks(db, {None: medication_ids}, today)[None]
+
+
+def adherence_streaks(db: Session, medication_ids_by_owner: dict, today: date) -> dict:
+    """
+    adherence_streak for many owners (e.g. users) at once: one bitmap query
+    per year walked back, shared by every owner whose streak reaches it.
+    """
+    streaks = {owner: 0 for owner in medication_ids_by_owner}
+    pending = {owner: ids for owner, ids in medication_ids_by_owner.items() if ids}
+    end_date = today
+    while pending:
+        start_date = date(end_date.year, 1, 1)
+        length = (end_date - start_date).days + 1
+        full = (1 << length) - 1
+        bitmaps = load_adherence(
+            db, [i for ids in pending.values() for i in ids], start_date, end_date
+        )
+
+        unbroken = {}
+        for owner, ids in pending.items():
+            combined = full
+            for medication_id in ids:
+                combined &= bitmaps[medication_id]
+            missed = ~combined & full
+            if missed:
+                # Highest missed day bounds the streak
+                streaks[owner] += length - missed.bit_length()
+            else:
+                streaks[owner] += length
+                unbroken[owner] = ids
+
+        pending = unbroken
+        end_date = start_date - timedelta(days=1)
+    return streaks
+
+
+def rebuild_adherence(db: Session, medication_ids: list = None):
+    """
+    Recompute bitmaps from medication_logs, for backfilling databases that
+    predate the adherence table. The caller commits.
+    """
+    query = db.query(MedicationLog).filter(MedicationLog.taken == True)
+    if medication_ids is not None:
+        query = query.filter(MedicationLog.medication_id.in_(medication_ids))
+
+    bitmaps = {}
+    owners = {}
+    for log in query.yield_per(1000):
+        key = (log.medication_id, log.taken_date.year)
+        bitmaps[key] = bitmaps.get(key, 0) | (1 << day_index(log.taken_date))
+        owners[key] = log.user_id
+
+    delete_query = db.query(MedicationAdherence)
+    if medication_ids is not None:
+        delete_query = delete_query.filter(MedicationAdherence.medication_id.in_(medication_ids))
+    delete_query.delete(synchronize_session=False)
+
+    db.bulk_insert_mappings(MedicationAdherence, [
+        {"medication_id": medication_id, "user_id": owners[(medication_id, year)], "year": year, "days": from_bits(bits)}
+        for (medication_id, year), bits in bitmaps.items()
+    ])
+    return len(bitmaps)
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = rebuild_adherence(db)
+        db.commit()
+        print(f"Rebuilt {count} adherence bitmaps")
+    finally:
+        db.close()
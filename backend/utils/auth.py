@@ -1,14 +1,53 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-from config import SECRET_KEY, ALGORITHM
-from database import get_db
-from models.user_model import User
+from typing import NamedTuple, Optional
+from datetime import datetime
+from config import SECRET_KEY, ALGORITHM, IDENTITY_CACHE_TTL_SECONDS
+from database import get_db, SessionLocal
+from models.user_model import User, PrimaryGoal
+from utils.ttl_cache import TTLCache
+
+IDENTITY_CACHE_SIZE = 10000
+
+
+class Identity(NamedTuple):
+    """
+    The authenticated user's columns, minus the password hash. Immutable
+    and not an ORM object, so it is safe to share between requests and
+    can't be added to a session by accident.
+    """
+    id: int
+    email: str
+    name: str
+    age_range: Optional[str]
+    primary_goal: PrimaryGoal
+    share_mood: bool
+    share_adherence: bool
+    share_activity: bool
+    created_at: datetime
+
+
+# Token subject (email) -> Identity
+_identities = TTLCache(IDENTITY_CACHE_SIZE, IDENTITY_CACHE_TTL_SECONDS)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+def invalidate_identity(subject: str):
+    """Drop a user's cached identity after their profile changes or the account is deleted"""
+    _identities.pop(subject)
+
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Identity:
+    """
+    The authenticated user's Identity, from the per-worker cache (loaded
+    from the database on a miss). Another worker's changes to the account,
+    including deleting it, are seen once the entry expires, after at most
+    IDENTITY_CACHE_TTL_SECONDS. Routes that modify or delete the account
+    use get_current_user_record.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -22,7 +61,46 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
+    identity = _identities.get(email)
+    if identity is None:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            raise credentials_exception
+        identity = Identity(**{field: getattr(user, field) for field in Identity._fields})
+        _identities.set(email, identity)
+    return identity
+
+
+def get_current_user_record(current_user: Identity = Depends(get_current_user), db: Session = Depends(get_db)) -> User:
+    """The authenticated user's row in this request's session, for routes that change it"""
+    user = db.get(User, current_user.id)
     if user is None:
-        raise credentials_exception
+        invalidate_identity(current_user.email)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
+
+
+def get_stream_user(
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    token: Optional[str] = Query(None, description="Bearer token, for clients such as EventSource that can't set headers")
+):
+    """
+    get_current_user for streaming endpoints, also accepting the token as a
+    query parameter. Uses its own short-lived session rather than get_db,
+    whose session would stay open until the stream ends.
+    """
+    if not (header_token or token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db = SessionLocal()
+    try:
+        return get_current_user(header_token or token, db)
+    finally:
+        db.close()
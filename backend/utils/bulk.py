@@ -0,0 +1,95 @@
+from sqlalchemy import and_, select, update, insert as sql_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+
+_DIALECT_INSERTS = {
+    "mysql": mysql.insert,
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+def _key_filter(table, key: dict):
+    return and_(*[table.c[col] == value for col, value in key.items()])
+
+
+def _upsert_portable(db: Session, table, rows: list, index_elements: list, update_columns: list):
+    # One statement per row; only for dialects without a native upsert
+    for row in rows:
+        key = {col: row[col] for col in index_elements}
+        exists = db.execute(select(1).select_from(table).where(_key_filter(table, key))).first()
+        if exists:
+            if update_columns:
+                db.execute(update(table).where(_key_filter(table, key)).values(
+                    **{col: row[col] for col in update_columns}
+                ))
+        else:
+            db.execute(sql_insert(table).values(**row))
+
+
+def upsert_rows(db: Session, model, rows: list, index_elements: list, update_columns: list):
+    """
+    Insert rows, updating update_columns when a row with the same
+    index_elements already exists; with no update_columns existing rows
+    are left as they are. Uses the dialect's native upsert (ON DUPLICATE
+    KEY UPDATE / ON CONFLICT) so the whole batch is one statement; other
+    dialects fall back to a select and an insert or update per row.
+    index_elements must be backed by a unique index.
+    """
+    if not rows:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    insert = _DIALECT_INSERTS.get(dialect)
+    if insert is None:
+        _upsert_portable(db, model.__table__, rows, index_elements, update_columns)
+        return len(rows)
+
+    stmt = insert(model.__table__).values(rows)
+    if not update_columns:
+        if dialect == "mysql":
+            # Assigning a key column to itself is MySQL's no-op upsert
+            first = index_elements[0]
+            stmt = stmt.on_duplicate_key_update(**{first: model.__table__.c[first]})
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+    elif dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(
+            **{col: stmt.inserted[col] for col in update_columns}
+        )
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={col: stmt.excluded[col] for col in update_columns}
+        )
+
+    db.execute(stmt)
+    return len(rows)
+
+
+def increment_counter(db: Session, model, key: dict, column: str, amount: int = 1):
+    """
+    Add amount to a counter column, creating the row (with the column set
+    to amount) if it doesn't exist yet. Runs as one native upsert, so
+    concurrent increments don't lose updates. Other dialects update in
+    place and insert when no row matched.
+    """
+    dialect = db.get_bind().dialect.name
+    insert = _DIALECT_INSERTS.get(dialect)
+    table = model.__table__
+    if insert is None:
+        result = db.execute(update(table).where(_key_filter(table, key)).values(
+            **{column: table.c[column] + amount}
+        ))
+        if result.rowcount == 0:
+            db.execute(sql_insert(table).values(**key, **{column: amount}))
+        return
+
+    stmt = insert(table).values(**key, **{column: amount})
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(**{column: table.c[column] + amount})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={column: table.c[column] + amount}
+        )
+    db.execute(stmt)
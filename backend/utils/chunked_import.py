@@ -0,0 +1,65 @@
+"""
+Chunked record imports
+
+Shared by the fitness file import and the account restore. Parsed records
+arrive as (row_number, record) pairs, where a record that couldn't be
+parsed is an exception. Each record is validated against a pydantic
+schema, and valid ones are handed to an insert callback in chunks of
+IMPORT_CHUNK_SIZE, so memory stays flat however large the file is.
+Invalid rows are counted and the first IMPORT_MAX_ERRORS are reported;
+they never abort the import. Nothing here commits: callers run the whole
+import as one transaction.
+"""
+
+from pydantic import ValidationError
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_ERRORS = 100
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+def import_records(records, schema, insert_chunk, errors: list, make_error) -> dict:
+    """
+    Validate records and insert them chunk by chunk. insert_chunk gets a
+    list of schema instances and returns how many it inserted; the rest
+    count as skipped. Row errors are appended to errors, built with
+    make_error(row_number, message), until it holds IMPORT_MAX_ERRORS.
+    Returns imported/skipped/failed counts.
+    """
+    counts = {"imported": 0, "skipped": 0, "failed": 0}
+
+    def record_error(row_number, message):
+        counts["failed"] += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append(make_error(row_number, message))
+
+    def flush(chunk):
+        imported = insert_chunk(chunk)
+        counts["imported"] += imported
+        counts["skipped"] += len(chunk) - imported
+
+    chunk = []
+    for row_number, record in records:
+        if isinstance(record, Exception):
+            record_error(row_number, f"Invalid JSON: {record.msg}")
+            continue
+        if not isinstance(record, dict):
+            record_error(row_number, "Expected an object")
+            continue
+        try:
+            chunk.append(schema(**record))
+        except ValidationError as e:
+            record_error(row_number, validation_message(e))
+            continue
+
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    return counts
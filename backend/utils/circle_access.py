@@ -0,0 +1,93 @@
+"""
+Circle authorization
+
+Resolves a circle together with the caller's membership and role in one
+joined query. The route dependencies below are resolved once per request
+by FastAPI's dependency cache, however many of them a route uses. When
+CIRCLE_ACCESS_TTL_SECONDS is set, results are also kept in a small
+per-process cache across requests. Routes that change a circle or its
+membership invalidate it, but other workers only notice once the entry
+expires, so keep the TTL short.
+"""
+
+from typing import Optional
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+from config import CIRCLE_ACCESS_TTL_SECONDS
+from database import get_db
+from models.circle_model import SupportCircle
+from models.circle_member_model import CircleMember, Role
+from utils.auth import Identity, get_current_user
+from utils.ttl_cache import TTLCache
+
+CIRCLE_ACCESS_CACHE_SIZE = 10000
+
+
+class CircleAccess:
+    """A circle's columns plus the caller's role in it (None if not a member)"""
+
+    def __init__(self, circle: SupportCircle, user_id: int, role: Optional[Role]):
+        self.id = circle.id
+        self.name = circle.name
+        self.created_by = circle.created_by
+        self.created_at = circle.created_at
+        self.user_id = user_id
+        self.role = role
+
+    @property
+    def is_member(self) -> bool:
+        return self.role is not None
+
+    @property
+    def is_owner(self) -> bool:
+        return self.created_by == self.user_id
+
+
+_cache = TTLCache(CIRCLE_ACCESS_CACHE_SIZE, CIRCLE_ACCESS_TTL_SECONDS)  # (circle_id, user_id) -> CircleAccess
+
+
+def invalidate_circle_access(circle_id: int, user_id: Optional[int] = None):
+    """Forget cached access to a circle, for one user or for everyone"""
+    if user_id is not None:
+        _cache.pop((circle_id, user_id))
+    else:
+        _cache.pop_where(lambda key: key[0] == circle_id)
+
+
+def load_circle_access(db: Session, circle_id: int, user_id: int) -> CircleAccess:
+    """The circle and the user's role in it. Raises 404 if the circle doesn't exist."""
+    key = (circle_id, user_id)
+    access = _cache.get(key)
+    if access is not None:
+        return access
+
+    row = db.query(SupportCircle, CircleMember.role).outerjoin(
+        CircleMember,
+        (CircleMember.circle_id == SupportCircle.id) & (CircleMember.user_id == user_id)
+    ).filter(SupportCircle.id == circle_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Circle not found")
+
+    access = CircleAccess(row[0], user_id, row[1])
+    _cache.set(key, access)
+    return access
+
+
+def get_circle_access(
+    circle_id: int,
+    db: Session = Depends(get_db),
+    current_user: Identity = Depends(get_current_user)
+) -> CircleAccess:
+    """Route dependency: the circle in the path and the caller's role, member or not"""
+    return load_circle_access(db, circle_id, current_user.id)
+
+
+def require_circle_member(access: CircleAccess):
+    if not access.is_member:
+        raise HTTPException(status_code=403, detail="Not a member of this circle")
+    return access
+
+
+def get_member_access(access: CircleAccess = Depends(get_circle_access)) -> CircleAccess:
+    """Route dependency: like get_circle_access, but 403 unless the caller is a member"""
+    return require_circle_member(access)
@@ -0,0 +1,167 @@
+"""
+Weekly circle wellness aggregates
+
+A batch job averages the members' mood, medication adherence and active
+days for every circle and week, and stores one circle_weekly_stats row
+per circle per week, so reading them is a primary-key lookup. Each metric
+is computed per member first and then averaged over the circle's members
+with one grouped query joined through circle_members, so every member
+counts equally however much they log.
+
+A member's data only counts towards a metric when they share it
+(users.share_mood / share_adherence / share_activity). An average based
+on fewer than MIN_CONTRIBUTORS members is stored as NULL, so small
+circles can't read an individual's numbers off it.
+"""
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, case, literal
+from sqlalchemy.orm import Session
+from models.user_model import User
+from models.circle_member_model import CircleMember
+from models.circle_weekly_stats_model import CircleWeeklyStats
+from models.journal_model import JournalEntry
+from models.medication_model import Medication
+from models.medication_log_model import MedicationLog
+from models.fitness_log_model import FitnessLog
+from utils.bulk import upsert_rows
+
+MIN_CONTRIBUTORS = 3
+WEEK_DAYS = 7
+
+
+def week_of(day: date) -> date:
+    """The Monday starting day's week"""
+    return day - timedelta(days=day.weekday())
+
+
+def _circle_averages(db: Session, per_member, share_column) -> dict:
+    """circle_id -> (average, contributors) of a per-member (user_id, value) subquery"""
+    rows = db.query(
+        CircleMember.circle_id,
+        func.avg(per_member.c.value),
+        func.count(per_member.c.user_id)
+    ).join(
+        per_member, per_member.c.user_id == CircleMember.user_id
+    ).join(
+        User, User.id == CircleMember.user_id
+    ).filter(share_column == True).group_by(CircleMember.circle_id)
+    return {circle_id: (float(average), contributors) for circle_id, average, contributors in rows}
+
+
+def compute_week(db: Session, week_start: date) -> list:
+    """circle_weekly_stats rows for every circle for the week starting week_start"""
+    week_end = week_start + timedelta(days=WEEK_DAYS - 1)
+    circle_users = db.query(CircleMember.user_id)
+
+    mood = db.query(
+        JournalEntry.user_id.label("user_id"),
+        func.avg(JournalEntry.sentiment_score).label("value")
+    ).filter(
+        JournalEntry.user_id.in_(circle_users),
+        JournalEntry.created_at >= datetime.combine(week_start, datetime.min.time()),
+        JournalEntry.created_at < datetime.combine(week_end + timedelta(days=1), datetime.min.time()),
+        JournalEntry.sentiment_score.isnot(None)
+    ).group_by(JournalEntry.user_id).subquery()
+
+    # Share of (medication, day) pairs in the week with a taken dose
+    taken = db.query(
+        MedicationLog.user_id.label("user_id"),
+        func.count(MedicationLog.id).label("taken")
+    ).filter(
+        MedicationLog.taken_date >= week_start,
+        MedicationLog.taken_date <= week_end,
+        MedicationLog.taken == True
+    ).group_by(MedicationLog.user_id).subquery()
+    adherence = db.query(
+        Medication.user_id.label("user_id"),
+        (func.coalesce(func.max(taken.c.taken), 0) * literal(1.0)
+         / (func.count(Medication.id) * WEEK_DAYS)).label("value")
+    ).outerjoin(
+        taken, taken.c.user_id == Medication.user_id
+    ).filter(
+        Medication.user_id.in_(circle_users)
+    ).group_by(Medication.user_id).subquery()
+
+    # Every sharing member counts, including those with no active days
+    active = db.query(
+        FitnessLog.user_id.label("user_id"),
+        func.count(func.distinct(case((FitnessLog.activity_completed == True, FitnessLog.log_date)))).label("days")
+    ).filter(
+        FitnessLog.log_date >= week_start,
+        FitnessLog.log_date <= week_end
+    ).group_by(FitnessLog.user_id).subquery()
+    activity = db.query(
+        User.id.label("user_id"),
+        func.coalesce(active.c.days, 0).label("value")
+    ).outerjoin(
+        active, active.c.user_id == User.id
+    ).filter(
+        User.id.in_(circle_users)
+    ).subquery()
+
+    member_counts = dict(db.query(
+        CircleMember.circle_id, func.count(CircleMember.id)
+    ).group_by(CircleMember.circle_id))
+    averages = {
+        "mood": _circle_averages(db, mood, User.share_mood),
+        "adherence": _circle_averages(db, adherence, User.share_adherence),
+        "active_days": _circle_averages(db, activity, User.share_activity),
+    }
+
+    def metric(name, circle_id, scale=1):
+        average, contributors = averages[name].get(circle_id, (None, 0))
+        if contributors < MIN_CONTRIBUTORS:
+            return None, contributors
+        return round(average * scale, 3), contributors
+
+    computed_at = datetime.utcnow()
+    rows = []
+    for circle_id, member_count in member_counts.items():
+        mood_avg, mood_members = metric("mood", circle_id)
+        adherence_pct, adherence_members = metric("adherence", circle_id, scale=100)
+        active_days_avg, activity_members = metric("active_days", circle_id)
+        rows.append({
+            "circle_id": circle_id,
+            "week_start": week_start,
+            "member_count": member_count,
+            "mood_avg": mood_avg,
+            "mood_members": mood_members,
+            "adherence_pct": adherence_pct,
+            "adherence_members": adherence_members,
+            "active_days_avg": active_days_avg,
+            "activity_members": activity_members,
+            "computed_at": computed_at
+        })
+    return rows
+
+
+def materialize_week(db: Session, week_start: date) -> int:
+    """Compute and store every circle's stats for a week. Safe to re-run."""
+    rows = compute_week(db, week_start)
+    upsert_rows(
+        db, CircleWeeklyStats, rows,
+        index_elements=["circle_id", "week_start"],
+        update_columns=[c.key for c in CircleWeeklyStats.__table__.columns if not c.primary_key]
+    )
+    db.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Store weekly wellness averages for every circle")
+    parser.add_argument("--week", type=date.fromisoformat, help="Any day of the week to compute (default: last week)")
+    parser.add_argument("--weeks", type=int, default=1, help="Number of weeks to compute, going back from --week")
+    args = parser.parse_args()
+
+    week_start = week_of(args.week or date.today() - timedelta(days=WEEK_DAYS))
+    db = SessionLocal()
+    try:
+        for offset in range(args.weeks):
+            week = week_start - timedelta(days=WEEK_DAYS * offset)
+            print(f"{week}: {materialize_week(db, week)} circles")
+    finally:
+        db.close()
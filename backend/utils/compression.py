@@ -0,0 +1,139 @@
+"""
+Compression at rest for journal content
+
+Entries are stored as bytes in a BLOB column: plain entries as UTF-8, long
+ones as a format marker followed by raw zlib data. The CompressedText
+column type compresses on write and decompresses on read, so the rest of
+the code only ever sees plain strings. Entries shorter than
+JOURNAL_COMPRESS_MIN_BYTES, or that don't shrink, are stored as-is.
+"""
+
+import zlib
+from sqlalchemy import LargeBinary, Text, cast
+from sqlalchemy.types import TypeDecorator
+from config import JOURNAL_COMPRESSION, JOURNAL_COMPRESS_MIN_BYTES
+
+# A NUL prefix never starts a plain entry on its own: plain text that does
+# is always stored compressed, so the marker is unambiguous
+ZLIB_MARKER = b"\x00z2:"
+
+
+def compress_text(text: str, enabled: bool = None, min_bytes: int = None) -> bytes:
+    if text is None:
+        return None
+    enabled = JOURNAL_COMPRESSION if enabled is None else enabled
+    min_bytes = JOURNAL_COMPRESS_MIN_BYTES if min_bytes is None else min_bytes
+
+    must_compress = text.startswith("\x00")
+    raw = text.encode("utf-8")
+    if not must_compress and (not enabled or len(raw) < min_bytes):
+        return raw
+
+    packed = ZLIB_MARKER + zlib.compress(raw, 6)
+    if not must_compress and len(packed) >= len(raw):
+        return raw
+    return packed
+
+
+def decompress_text(value) -> str:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # Not yet converted from TEXT
+        value = value.encode("utf-8")
+    value = bytes(value)
+    if value.startswith(ZLIB_MARKER):
+        value = zlib.decompress(value[len(ZLIB_MARKER):])
+    return value.decode("utf-8")
+
+
+def is_compressed(value) -> bool:
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return value is not None and value.startswith(ZLIB_MARKER)
+
+
+class CompressedText(TypeDecorator):
+    """BLOB column holding text that transparently compresses long values"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+    def coerce_compared_value(self, op, value):
+        # LIKE patterns and comparisons are bound as plain text
+        return Text()
+
+
+def content_as_text(column):
+    """SQL expression for a CompressedText column as text, for LIKE and SUBSTR. Compressed rows won't match."""
+    return cast(column, Text)
+
+
+def migrate_journal_content(db, batch_size: int = 500, pause: float = 0.0) -> int:
+    """
+    Rewrite existing journal rows in the configured format, one committed
+    chunk at a time, and fill in missing excerpts. Compresses long entries
+    when JOURNAL_COMPRESSION is on and decompresses them when it is off.
+    Returns the number of rows rewritten.
+    """
+    import time
+    from sqlalchemy import update, bindparam, type_coerce
+    from models.journal_model import JournalEntry, EXCERPT_LENGTH
+
+    table = JournalEntry.__table__
+    stored_content = type_coerce(table.c.content, LargeBinary)
+    rewrite = update(table).where(table.c.id == bindparam("entry_id")).values(
+        content=type_coerce(bindparam("stored"), LargeBinary),
+        excerpt=bindparam("new_excerpt")
+    )
+
+    rewritten = 0
+    last_id = 0
+    while True:
+        batch = db.query(table.c.id, stored_content, table.c.excerpt).filter(
+            table.c.id > last_id
+        ).order_by(table.c.id).limit(batch_size).all()
+        if not batch:
+            return rewritten
+
+        changes = []
+        for entry_id, stored, excerpt in batch:
+            content = decompress_text(stored)
+            desired = compress_text(content)
+            if desired != stored or excerpt is None:
+                changes.append({
+                    "entry_id": entry_id,
+                    "stored": desired,
+                    "new_excerpt": content[:EXCERPT_LENGTH + 1]
+                })
+
+        if changes:
+            db.execute(rewrite, changes)
+            db.commit()
+            rewritten += len(changes)
+
+        last_id = batch[-1][0]
+        if pause:
+            time.sleep(pause)
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rewrite journal content in the configured storage format")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = migrate_journal_content(db, args.batch_size, args.pause)
+        print(f"Rewrote {count} journal entries")
+    finally:
+        db.close()
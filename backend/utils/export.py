@@ -0,0 +1,207 @@
+"""
+Streaming export writers
+
+Exports are generated row by row: queries are read in yield_per chunks and
+each record is written straight to the response as CSV (through the csv
+module), NDJSON, or a JSON envelope, so memory stays flat however large
+the account is.
+
+Parquet and Arrow IPC exports skip per-row records altogether: cursor
+batches are transposed into typed columns and written as one row group or
+record batch each. They need the optional pyarrow package.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from database import SessionLocal
+
+# Rows fetched per round trip while streaming
+CHUNK_ROWS = 500
+
+# Flush output to the client once this many characters are buffered
+FLUSH_CHARS = 64 * 1024
+
+# Rows per Parquet row group / Arrow record batch
+BATCH_ROWS = 10000
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+def plain(value):
+    """Convert a column value to a JSON/CSV friendly scalar"""
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "value"):  # enum members
+        return value.value
+    return value
+
+
+def stream_records(generate, *args):
+    """
+    Run generate(db, *args) in a session owned by the stream.
+
+    The request's session may already be closed by the time the response
+    body is sent, so the stream opens its own and closes it when the last
+    record has been written (or the client disconnects).
+    """
+    db = SessionLocal()
+    try:
+        yield from generate(db, *args)
+    finally:
+        db.close()
+
+
+def _buffered(pieces):
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= FLUSH_CHARS:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def csv_lines(columns: list, records):
+    """Yield CSV text for dict records, header first"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    for record in records:
+        writer.writerow([plain(record.get(c)) for c in columns])
+        if out.tell() >= FLUSH_CHARS:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue()
+
+
+def ndjson_lines(records):
+    """Yield one JSON document per line"""
+    return _buffered(
+        json.dumps(record, default=plain, separators=(",", ":")) + "\n"
+        for record in records
+    )
+
+
+def json_envelope(records):
+    """
+    Yield {"format": "json", "data": [...], "count": n}. The count is only
+    known once every record is out, so it comes after the data.
+    """
+    def pieces():
+        yield '{"format":"json","data":['
+        count = 0
+        for record in records:
+            yield ("," if count else "") + json.dumps(record, default=plain, separators=(",", ":"))
+            count += 1
+        yield f'],"count":{count}}}'
+    return _buffered(pieces())
+
+
+def export_response(format: str, columns: list, records, filename: str) -> StreamingResponse:
+    """Wrap a record iterator in a streaming response of the requested format"""
+    if format == "csv":
+        body = csv_lines(columns, records)
+    elif format == "ndjson":
+        body = ndjson_lines(records)
+    else:
+        body = json_envelope(records)
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+class _DrainableSink:
+    """Write-only file object whose output is handed to the client after each batch"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _columnar_stream(format: str, statement, columns: list):
+    import pyarrow as pa
+
+    schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in columns])
+    sink = _DrainableSink()
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(statement, execution_options={"yield_per": BATCH_ROWS})
+        for rows in result.partitions():
+            values = list(zip(*rows))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(values, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+    finally:
+        db.close()
+
+
+def columnar_response(format: str, statement, columns: list, filename: str) -> StreamingResponse:
+    """
+    Stream the rows of a core select as Parquet or Arrow IPC. columns pairs
+    each selected column, in order, with a pyarrow type alias such as
+    "int64", "string" or "timestamp[us]".
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(status_code=501, detail=f"{format} export requires the pyarrow package")
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    return StreamingResponse(
+        _columnar_stream(format, statement, columns),
+        media_type=MEDIA_TYPES[format],
+        headers=headers
+    )
@@ -0,0 +1,91 @@
+"""
+Per-user message inbox
+
+Messages addressed to a user are listed straight from
+encouragement_messages through the (receiver_id, created_at) index.
+Unread counts live in inbox_counters, one row per user and circle: sending
+a message increments the receiver's row, and marking a circle read moves
+its last_read_id forward and recounts what is left. Reading the badge
+count is a primary-key range read that never touches the messages.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models.inbox_counter_model import InboxCounter
+from models.message_model import EncouragementMessage
+from utils.bulk import increment_counter, upsert_rows
+
+
+def count_new_message(db: Session, message: EncouragementMessage):
+    """Add a just-sent message to its receiver's unread count. The caller commits."""
+    if message.receiver_id == message.sender_id:
+        return
+    increment_counter(
+        db, InboxCounter,
+        {"user_id": message.receiver_id, "circle_id": message.circle_id},
+        "unread"
+    )
+
+
+def read_watermarks(db: Session, user_id: int) -> dict:
+    """circle_id -> id of the last message the user has read there"""
+    return dict(db.query(InboxCounter.circle_id, InboxCounter.last_read_id).filter(
+        InboxCounter.user_id == user_id
+    ))
+
+
+def unread_counts(db: Session, user_id: int) -> dict:
+    """circle_id -> unread messages, for circles with any"""
+    return dict(db.query(InboxCounter.circle_id, InboxCounter.unread).filter(
+        InboxCounter.user_id == user_id,
+        InboxCounter.unread > 0
+    ))
+
+
+def mark_read(db: Session, user_id: int, circle_id: int, up_to_id: int = None) -> int:
+    """
+    Mark the user's messages in a circle read up to up_to_id (default: all
+    of them) and return how many stay unread. The counter row is created
+    if needed and locked while recounting, so a concurrent send's
+    increment lands after it. The caller checks access and commits.
+    """
+    addressed = db.query(EncouragementMessage).filter(
+        EncouragementMessage.receiver_id == user_id,
+        EncouragementMessage.circle_id == circle_id
+    )
+    latest = addressed.with_entities(func.max(EncouragementMessage.id)).scalar() or 0
+    if up_to_id is None or up_to_id > latest:
+        up_to_id = latest
+
+    upsert_rows(
+        db, InboxCounter,
+        [{"user_id": user_id, "circle_id": circle_id, "unread": 0, "last_read_id": 0}],
+        index_elements=["user_id", "circle_id"],
+        update_columns=[]
+    )
+    counter = db.query(InboxCounter).filter(
+        InboxCounter.user_id == user_id,
+        InboxCounter.circle_id == circle_id
+    ).with_for_update().populate_existing().one()
+
+    counter.last_read_id = max(counter.last_read_id, up_to_id)
+    counter.unread = addressed.filter(
+        EncouragementMessage.id > counter.last_read_id,
+        EncouragementMessage.sender_id != user_id
+    ).count()
+    return counter.unread
+
+
+def recount_unread(db: Session, user_ids: list):
+    """Recompute the users' unread counts from the messages, e.g. after messages were deleted. The caller commits."""
+    if not user_ids:
+        return
+    remaining = select(func.count(EncouragementMessage.id)).where(
+        EncouragementMessage.receiver_id == InboxCounter.user_id,
+        EncouragementMessage.circle_id == InboxCounter.circle_id,
+        EncouragementMessage.id > InboxCounter.last_read_id,
+        EncouragementMessage.sender_id != EncouragementMessage.receiver_id
+    ).scalar_subquery()
+    db.query(InboxCounter).filter(InboxCounter.user_id.in_(user_ids)).update(
+        {InboxCounter.unread: remaining}, synchronize_session=False
+    )
@@ -0,0 +1,43 @@
+"""
+Intraday activity storage
+
+Minute-level samples are kept as one intraday_activity row per user per
+day, holding a packed array of 1440 little-endian uint16 values for each
+metric. Reading a time range slices the bytes it needs instead of
+decoding whole days.
+"""
+
+import struct
+
+MINUTES_PER_DAY = 1440
+EMPTY_DAY = bytes(MINUTES_PER_DAY * 2)
+
+# Minutes at or above this cadence count as exercise in derived daily totals
+ACTIVE_STEPS_PER_MINUTE = 100
+ACTIVE_MINUTES_GOAL = 30
+
+
+def unpack(data: bytes, start: int = 0, end: int = MINUTES_PER_DAY) -> list:
+    """Decode minutes [start, end) of a packed day"""
+    return list(struct.unpack_from(f"<{end - start}H", data or EMPTY_DAY, start * 2))
+
+
+def pack(values: list) -> bytes:
+    return struct.pack(f"<{MINUTES_PER_DAY}H", *values)
+
+
+def daily_totals(steps: list) -> dict:
+    """Derive FitnessLog fields from a day of per-minute step counts"""
+    minutes_exercised = sum(1 for s in steps if s >= ACTIVE_STEPS_PER_MINUTE)
+    if minutes_exercised >= 2 * ACTIVE_MINUTES_GOAL:
+        intensity = "HIGH"
+    elif minutes_exercised >= ACTIVE_MINUTES_GOAL:
+        intensity = "MEDIUM"
+    else:
+        intensity = "LOW"
+    return {
+        "steps": sum(steps),
+        "minutes_exercised": minutes_exercised,
+        "activity_completed": minutes_exercised >= ACTIVE_MINUTES_GOAL,
+        "intensity": intensity
+    }
@@ -0,0 +1,167 @@
+"""
+Circle member leaderboard
+
+Medication and fitness streaks plus this week's activity for every member
+of a circle, computed with a fixed number of set-based queries however
+many members the circle has. Results are cached per circle for the day
+and dropped whenever a member logs activity, changes their sharing
+settings or the membership changes.
+
+Medication metrics are only shown for members with users.share_adherence
+set and fitness metrics only for those with users.share_activity; the
+others are None and never computed.
+"""
+
+import json
+from collections import defaultdict
+from datetime import date, timedelta
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from models.user_model import User
+from models.circle_member_model import CircleMember
+from models.circle_leaderboard_cache_model import CircleLeaderboardCache
+from models.medication_model import Medication
+from models.fitness_log_model import FitnessLog
+from utils.adherence import adherence_streaks, load_adherence
+from utils.bulk import upsert_rows
+
+# Days of fitness history read per query while walking back a streak
+STREAK_WINDOW_DAYS = 366
+WEEK_DAYS = 7
+
+
+def _activity_streaks(db: Session, user_ids: list, today: date) -> dict:
+    """Consecutive active days ending today per user, one query per window walked back"""
+    streaks = {user_id: 0 for user_id in user_ids}
+    pending = set(user_ids)
+    end_date = today
+    while pending:
+        start_date = end_date - timedelta(days=STREAK_WINDOW_DAYS - 1)
+        active = defaultdict(set)
+        for user_id, log_date in db.query(FitnessLog.user_id, FitnessLog.log_date).filter(
+            FitnessLog.user_id.in_(pending),
+            FitnessLog.log_date >= start_date,
+            FitnessLog.log_date <= end_date,
+            FitnessLog.activity_completed == True
+        ).distinct():
+            active[user_id].add(log_date)
+
+        unbroken = set()
+        for user_id in pending:
+            run = 0
+            while end_date - timedelta(days=run) in active[user_id]:
+                run += 1
+            streaks[user_id] += run
+            if run == STREAK_WINDOW_DAYS:
+                unbroken.add(user_id)
+
+        pending = unbroken
+        end_date = start_date - timedelta(days=1)
+    return streaks
+
+
+def compute_leaderboard(db: Session, circle_id: int, today: date) -> list:
+    members = db.query(
+        User.id, User.name, CircleMember.role, User.share_adherence, User.share_activity
+    ).join(
+        CircleMember, CircleMember.user_id == User.id
+    ).filter(CircleMember.circle_id == circle_id).all()
+    if not members:
+        return []
+    adherence_ids = [m.id for m in members if m.share_adherence]
+    activity_ids = [m.id for m in members if m.share_activity]
+
+    medication_ids = {user_id: [] for user_id in adherence_ids}
+    if adherence_ids:
+        for medication_id, user_id in db.query(Medication.id, Medication.user_id).filter(
+            Medication.user_id.in_(adherence_ids)
+        ):
+            medication_ids[user_id].append(medication_id)
+
+    medication_streaks = adherence_streaks(db, medication_ids, today)
+    fitness_streaks = _activity_streaks(db, activity_ids, today)
+
+    week_start = today - timedelta(days=WEEK_DAYS - 1)
+    week_bits = load_adherence(
+        db, [i for ids in medication_ids.values() for i in ids], week_start, today
+    )
+    weekly = {}
+    if activity_ids:
+        weekly = {
+            row.user_id: row for row in db.query(
+                FitnessLog.user_id,
+                func.count(func.distinct(case((FitnessLog.activity_completed == True, FitnessLog.log_date)))).label("days_active"),
+                func.coalesce(func.sum(FitnessLog.steps), 0).label("steps"),
+                func.coalesce(func.sum(FitnessLog.minutes_exercised), 0).label("minutes")
+            ).filter(
+                FitnessLog.user_id.in_(activity_ids),
+                FitnessLog.log_date >= week_start,
+                FitnessLog.log_date <= today
+            ).group_by(FitnessLog.user_id)
+        }
+
+    board = []
+    for member in members:
+        entry = {
+            "user_id": member.id,
+            "name": member.name,
+            "role": member.role.value,
+            "medication_streak": None,
+            "fitness_streak": None,
+            "days_active_week": None,
+            "steps_week": None,
+            "minutes_week": None,
+            "doses_taken_week": None
+        }
+        if member.share_adherence:
+            entry["medication_streak"] = medication_streaks[member.id]
+            entry["doses_taken_week"] = sum(week_bits[i].bit_count() for i in medication_ids[member.id])
+        if member.share_activity:
+            week = weekly.get(member.id)
+            entry["fitness_streak"] = fitness_streaks[member.id]
+            entry["days_active_week"] = int(week.days_active) if week else 0
+            entry["steps_week"] = int(week.steps) if week else 0
+            entry["minutes_week"] = int(week.minutes) if week else 0
+        board.append(entry)
+
+    # Hidden metrics rank as 0
+    board.sort(key=lambda m: (
+        -((m["medication_streak"] or 0) + (m["fitness_streak"] or 0)),
+        -(m["days_active_week"] or 0),
+        m["user_id"]
+    ))
+    return board
+
+
+def get_leaderboard(db: Session, circle_id: int, today: date) -> list:
+    """Today's leaderboard for a circle, from the cache when it is still valid"""
+    cache = db.query(CircleLeaderboardCache).filter(
+        CircleLeaderboardCache.circle_id == circle_id
+    ).first()
+    if cache and cache.computed_on == today:
+        return json.loads(cache.members)
+
+    board = compute_leaderboard(db, circle_id, today)
+    upsert_rows(
+        db, CircleLeaderboardCache,
+        [{"circle_id": circle_id, "computed_on": today, "members": json.dumps(board)}],
+        index_elements=["circle_id"],
+        update_columns=["computed_on", "members"]
+    )
+    db.commit()
+    return board
+
+
+def invalidate_circle_leaderboard(db: Session, circle_id: int):
+    """Drop a circle's cached leaderboard after its membership changes. The caller commits."""
+    db.query(CircleLeaderboardCache).filter(
+        CircleLeaderboardCache.circle_id == circle_id
+    ).delete(synchronize_session=False)
+
+
+def invalidate_member_leaderboards(db: Session, user_id: int):
+    """Drop the cached leaderboards of every circle the user belongs to. The caller commits."""
+    circle_ids = db.query(CircleMember.circle_id).filter(CircleMember.user_id == user_id)
+    db.query(CircleLeaderboardCache).filter(
+        CircleLeaderboardCache.circle_id.in_(circle_ids)
+    ).delete(synchronize_session=False)
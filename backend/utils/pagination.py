@@ -0,0 +1,93 @@
+"""
+Keyset (cursor) pagination
+
+List routes order by a sort column plus id and hand out an opaque cursor
+holding the last row's (sort value, id). The next page filters past that
+key instead of using OFFSET, so every page costs the same however deep
+the client pages. Cursors go in the X-Next-Cursor response header so list
+bodies stay plain arrays.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _serialize(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([_serialize(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: list) -> list:
+    """Decode a cursor, converting each value with the matching parser"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("wrong cursor length")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parser_for(column):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat
+    if python_type is date:
+        return date.fromisoformat
+    return python_type
+
+
+def keyset_page(
+    query,
+    response: Response,
+    id_column,
+    limit: int,
+    cursor: str = None,
+    sort_column=None,
+    descending: bool = True,
+    offset: int = 0
+) -> list:
+    """
+    Fetch one page ordered by (sort_column, id_column) and set the
+    X-Next-Cursor header when more rows follow. offset is only for legacy
+    page-number requests without a cursor.
+    """
+    columns = [c for c in (sort_column, id_column) if c is not None]
+
+    if cursor:
+        values = decode_cursor(cursor, [_parser_for(c) for c in columns])
+        past = (lambda c, v: c < v) if descending else (lambda c, v: c > v)
+        if sort_column is not None:
+            query = query.filter(or_(
+                past(sort_column, values[0]),
+                and_(sort_column == values[0], past(id_column, values[1]))
+            ))
+        else:
+            query = query.filter(past(id_column, values[0]))
+        offset = 0
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    rows = query.offset(offset).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows
+
+
+def set_total_count(response: Response, query):
+    response.headers[TOTAL_COUNT_HEADER] = str(query.order_by(None).count())
@@ -0,0 +1,104 @@
+"""
+Publish/subscribe hub for live updates
+
+Routes publish JSON-serializable events to named channels (for example
+"circle:12") and streaming endpoints subscribe to them. The broker is
+pluggable: LocalBroker fans out to subscribers in this process, which is
+enough for a single worker. Multi-worker deployments can install a broker
+backed by a shared message bus with set_broker(). Either way, subscribers
+that fall behind are dropped rather than buffered without limit. Clients
+then reconnect and replay what they missed from the database.
+"""
+
+import asyncio
+import threading
+
+# Events buffered per subscriber before it is considered too slow and dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Events for one subscriber, delivered to the event loop that created it"""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = False
+
+    def deliver(self, event: dict):
+        """Queue an event from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # the subscriber's event loop has shut down
+
+    def _put(self, event: dict):
+        if self.dropped:
+            return
+        if self.queue.full():
+            self.dropped = True
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float):
+        """Next event, or None on timeout. Raises ConnectionResetError once dropped."""
+        if self.dropped:
+            raise ConnectionResetError("Subscriber fell behind")
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker:
+    """Interface for pub/sub backends"""
+
+    def publish(self, channel: str, event: dict):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription: Subscription):
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """In-process fan-out; only reaches subscribers connected to this worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def publish(self, channel: str, event: dict):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+
+_broker: Broker = LocalBroker()
+
+
+def get_broker() -> Broker:
+    return _broker
+
+
+def set_broker(broker: Broker):
+    global _broker
+    _broker = broker
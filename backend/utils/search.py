@@ -0,0 +1,187 @@
+"""
+Journal full-text search
+
+An inverted index of (user_id, term) -> entry rows in journal_terms, kept
+up to date when entries are created, updated or deleted. Queries touch
+only the index rows for the searched terms, so latency depends on how
+many entries match rather than on the size of the journal.
+"""
+
+import html
+import math
+import re
+from collections import Counter
+from sqlalchemy import func, case, distinct, insert
+from sqlalchemy.orm import Session
+from models.journal_model import JournalEntry
+from models.journal_term_model import JournalTerm
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+MAX_TERM_LENGTH = 64
+SNIPPET_LENGTH = 160
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if",
+    "in", "into", "is", "it", "its", "of", "on", "or", "so", "such", "that",
+    "the", "their", "then", "there", "these", "they", "this", "to", "was",
+    "were", "will", "with"
+}
+
+
+def tokenize(text: str) -> list:
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def query_terms(query: str) -> list:
+    """Unique indexable terms of a search query, in query order"""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def _term_rows(entry_id: int, user_id: int, content: str) -> list:
+    return [
+        {"entry_id": entry_id, "user_id": user_id, "term": term, "frequency": frequency}
+        for term, frequency in Counter(tokenize(content)).items()
+    ]
+
+
+def index_entry(db: Session, entry_id: int, user_id: int, content: str):
+    """Replace the index rows for an entry. The caller commits."""
+    unindex_entry(db, entry_id)
+    rows = _term_rows(entry_id, user_id, content)
+    if rows:
+        db.execute(insert(JournalTerm), rows)
+
+
+def index_new_entries(db: Session, entries: list):
+    """Index entries that have no index rows yet in one statement. The caller commits."""
+    rows = [row for entry in entries for row in _term_rows(entry.id, entry.user_id, entry.content)]
+    if rows:
+        db.execute(insert(JournalTerm), rows)
+
+
+def unindex_entry(db: Session, entry_id: int):
+    db.query(JournalTerm).filter(JournalTerm.entry_id == entry_id).delete(synchronize_session=False)
+
+
+def matching_entry_ids(db: Session, user_id: int, terms: list):
+    """Subquery of entry ids containing every term, for filtering lists"""
+    return db.query(JournalTerm.entry_id).filter(
+        JournalTerm.user_id == user_id,
+        JournalTerm.term.in_(terms)
+    ).group_by(JournalTerm.entry_id).having(
+        func.count(distinct(JournalTerm.term)) == len(terms)
+    )
+
+
+def search_entries(db: Session, user_id: int, terms: list, offset: int, limit: int) -> tuple:
+    """
+    Rank the user's entries by how many terms they contain, then by tf-idf.
+    Returns (total_matches, [(entry_id, score), ...]) for the requested page.
+    """
+    total_entries = db.query(func.count(JournalEntry.id)).filter(
+        JournalEntry.user_id == user_id
+    ).scalar() or 0
+
+    document_frequency = dict(db.query(
+        JournalTerm.term, func.count(JournalTerm.id)
+    ).filter(
+        JournalTerm.user_id == user_id,
+        JournalTerm.term.in_(terms)
+    ).group_by(JournalTerm.term).all())
+
+    if not document_frequency:
+        return 0, []
+
+    idf = {
+        term: math.log(1 + total_entries / df)
+        for term, df in document_frequency.items()
+    }
+    weight = case(
+        *[(JournalTerm.term == term, value) for term, value in idf.items()],
+        else_=0.0
+    )
+    matched = func.count(distinct(JournalTerm.term)).label("matched")
+    score = func.sum(JournalTerm.frequency * weight).label("score")
+
+    base = db.query(JournalTerm.entry_id).filter(
+        JournalTerm.user_id == user_id,
+        JournalTerm.term.in_(idf.keys())
+    )
+    total = base.distinct().count()
+
+    hits = base.add_columns(matched, score).group_by(
+        JournalTerm.entry_id
+    ).order_by(
+        matched.desc(), score.desc(), JournalTerm.entry_id.desc()
+    ).offset(offset).limit(limit).all()
+
+    return total, [(entry_id, round(float(hit_score), 4)) for entry_id, _, hit_score in hits]
+
+
+def highlight(content: str, terms: list, length: int = SNIPPET_LENGTH) -> str:
+    """
+    HTML-escaped excerpt around the first matching term, with every
+    matching word wrapped in <mark></mark>.
+    """
+    pattern = re.compile(
+        r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b",
+        re.IGNORECASE
+    )
+    first = pattern.search(content)
+    start = max(0, first.start() - length // 4) if first else 0
+    end = min(len(content), start + length)
+    excerpt = content[start:end]
+
+    parts = []
+    last = 0
+    for match in pattern.finditer(excerpt):
+        parts.append(html.escape(excerpt[last:match.start()]))
+        parts.append("<mark>" + html.escape(match.group(0)) + "</mark>")
+        last = match.end()
+    parts.append(html.escape(excerpt[last:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    return prefix + "".join(parts) + suffix
+
+
+def rebuild_index(db: Session, user_id: int = None, batch_size: int = 500):
+    """Reindex every journal entry, for backfilling. The caller commits."""
+    delete_query = db.query(JournalTerm)
+    entries = db.query(JournalEntry.id, JournalEntry.user_id, JournalEntry.content)
+    if user_id is not None:
+        delete_query = delete_query.filter(JournalTerm.user_id == user_id)
+        entries = entries.filter(JournalEntry.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    count = 0
+    last_id = 0
+    while True:
+        batch = entries.filter(JournalEntry.id > last_id).order_by(JournalEntry.id).limit(batch_size).all()
+        if not batch:
+            return count
+        rows = [
+            row
+            for entry_id, entry_user_id, content in batch
+            for row in _term_rows(entry_id, entry_user_id, content)
+        ]
+        if rows:
+            db.execute(insert(JournalTerm), rows)
+        count += len(batch)
+        last_id = batch[-1].id
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = rebuild_index(db)
+        db.commit()
+        print(f"Indexed {count} journal entries")
+    finally:
+        db.close()
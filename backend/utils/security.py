@@ -1,18 +1,102 @@
+"""
+Password hashing and access tokens
+
+bcrypt is deliberately slow, so hashing and verification run on a small
+process pool instead of the request threads. At most
+PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE requests wait on the pool;
+further ones fail immediately with 503 instead of tying up the server's
+threadpool during a login storm. Callers end their database transaction
+first, so waiting requests hold a request thread but no pooled connection.
+PASSWORD_HASH_WORKERS=0 hashes inline.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def hash_password(password: str):
+# Seconds clients are asked to wait after a 503
+HASH_RETRY_AFTER = 1
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain_password, hashed_password):
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor):
+    """Replace a broken pool, unless another request already has"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    # Reap the remaining workers and fail anything still queued on it
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """Stop the hashing processes; called when the app shuts down"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _run(fn, *args):
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many sign-in requests, try again shortly",
+            headers={"Retry-After": str(HASH_RETRY_AFTER)}
+        )
+    try:
+        pool = _get_pool()
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool for later requests
+        _reset_pool(pool)
+        raise HTTPException(
+            status_code=503,
+            detail="Password service restarting, try again shortly",
+            headers={"Retry-After": str(HASH_RETRY_AFTER)}
+        )
+    finally:
+        _slots.release()
+
+
+def hash_password(password: str):
+    return _run(_hash, password)
+
+def verify_password(plain_password, hashed_password):
+    return _run(_verify, plain_password, hashed_password)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
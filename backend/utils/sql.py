@@ -0,0 +1,67 @@
+from sqlalchemy import func, Date, Integer, cast, extract
+from datetime import date, datetime, timedelta
+
+GRANULARITIES = ("day", "week", "month", "year")
+SUPPORTED_DIALECTS = ("mysql", "sqlite", "postgresql")
+
+def period_start(column, granularity: str, dialect: str):
+    """
+    SQL expression for the first day of the day/week/month/year that
+    column falls in, for GROUP BY bucketing. Weeks start on Monday.
+    Returns None for other dialects; callers then load the rows and
+    bucket them with period_of.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'")
+
+    if dialect not in SUPPORTED_DIALECTS:
+        return None
+
+    if granularity == "day":
+        return func.date(column)
+
+    if dialect == "mysql":
+        if granularity == "week":
+            return func.subdate(func.date(column), func.weekday(column))
+        if granularity == "month":
+            return func.date_format(column, "%Y-%m-01")
+        return func.date_format(column, "%Y-01-01")
+
+    if dialect == "sqlite":
+        if granularity == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        if granularity == "month":
+            return func.strftime("%Y-%m-01", column)
+        return func.strftime("%Y-01-01", column)
+
+    if dialect == "postgresql":
+        return cast(func.date_trunc(granularity, column), Date)
+
+def period_of(value, granularity: str) -> date:
+    """Python counterpart of period_start for a single date or datetime"""
+    day = as_date(value)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+def weekday_of(column, dialect: str):
+    """SQL expression for the weekday of column, 0 = Monday, or None for other dialects (use date.weekday())"""
+    if dialect == "mysql":
+        return func.weekday(column)
+    if dialect == "sqlite":
+        return (cast(func.strftime("%w", column), Integer) + 6) % 7
+    if dialect == "postgresql":
+        return extract("isodow", column) - 1
+    return None
+
+def as_date(value) -> date:
+    """Normalize a date-like value returned by the driver"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
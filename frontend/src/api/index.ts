@@ -1,6 +1,6 @@
 import axios from 'axios';
 import type { 
-  AuthResponse, User, JournalEntry, Medication, 
+  AuthResponse, User, JournalEntry, JournalSummary, Medication, 
   MedicationSummary, FitnessLog, WeeklyFitness, MonthlyFitness,
   SupportCircle, CircleWithMembers, EncouragementMessage,
   WeeklyInsights, UserStats 
@@ -56,6 +56,9 @@ export const createJournal = (content: string) =>
 export const getJournals = (params?: { page?: number; limit?: number; search?: string; start_date?: string; end_date?: string }) =>
   api.get<JournalEntry[]>('/journal', { params });
 
+export const getJournalSummaries = (params?: { page?: number; limit?: number; search?: string; start_date?: string; end_date?: string }) =>
+  api.get<JournalSummary[]>('/journal', { params: { ...params, view: 'summary' } });
+
 export const getJournal = (id: number) => api.get<JournalEntry>(`/journal/${id}`);
 
 export const updateJournal = (id: number, content: string) =>
@@ -126,6 +129,15 @@ export const getCircleMessages = (id: number) => api.get<EncouragementMessage[]>
 export const sendCircleMessage = (id: number, data: { receiver_id: number; message: string }) =>
   api.post<EncouragementMessage>(`/circles/${id}/message`, data);
 
+// EventSource can't send headers, so the token goes in the query string
+export const circleEventsUrl = (id: number, since?: number) => {
+  const params = new URLSearchParams();
+  const token = localStorage.getItem('token');
+  if (token) params.set('token', token);
+  if (since !== undefined) params.set('since', String(since));
+  return `${API_URL}/circles/${id}/events?${params}`;
+};
+
 // Insights
 export const getWeeklyInsights = () => api.get<WeeklyInsights>('/insights/weekly');
 
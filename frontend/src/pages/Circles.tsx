@@ -1,7 +1,10 @@
-import { useState, useEffect } from 'react';
-import { createCircle, getCircles, joinCircle, getCircleMessages, sendCircleMessage, leaveCircle } from '../api';
+import { useState, useEffect, useRef } from 'react';
+import { createCircle, getCircles, joinCircle, getCircleMessages, getCircleMembers, sendCircleMessage, leaveCircle, circleEventsUrl } from '../api';
+import { useAuth } from '../context/AuthContext';
+import type { CircleMember } from '../types';
 
 export default function Circles() {
+  const { user } = useAuth();
   const [circles, setCircles] = useState<any[]>([]);
   const [messages, setMessages] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
@@ -10,6 +13,18 @@ export default function Circles() {
   const [newCircleName, setNewCircleName] = useState('');
   const [messageText, setMessageText] = useState('');
   const [selectedCircle, setSelectedCircle] = useState<any>(null);
+  const [recipients, setRecipients] = useState<CircleMember[]>([]);
+  const [receiverId, setReceiverId] = useState('');
+  const eventsRef = useRef<EventSource | null>(null);
+
+  const addMessage = (msg: any) => {
+    setMessages((prev) => (prev.some((m) => m.id === msg.id) ? prev : [msg, ...prev]));
+  };
+
+  const closeEvents = () => {
+    eventsRef.current?.close();
+    eventsRef.current = null;
+  };
 
   const fetchCircles = async () => {
     setLoading(true);
@@ -27,6 +42,7 @@ export default function Circles() {
 
   useEffect(() => {
     fetchCircles();
+    return closeEvents;
   }, []);
 
   const handleCreate = async (e: React.FormEvent) => {
@@ -82,27 +98,42 @@ export default function Circles() {
   };
 
   const handleViewMessages = async (circle: any) => {
+    closeEvents();
     setSelectedCircle(circle);
     setShowMessages(circle.id);
+    setRecipients([]);
+    setReceiverId('');
     try {
+      const membersRes = await getCircleMembers(circle.id);
+      const others = membersRes.data.members.filter((m) => m.user_id !== user?.id);
+      setRecipients(others);
+      if (others.length === 1) setReceiverId(String(others[0].user_id));
       const res = await getCircleMessages(circle.id);
       setMessages(res.data);
+      // Live updates from the newest message on; reconnects resume via Last-Event-ID
+      const events = new EventSource(circleEventsUrl(circle.id, res.data[0]?.id ?? 0));
+      events.addEventListener('message', (e) => addMessage(JSON.parse((e as MessageEvent).data)));
+      eventsRef.current = events;
     } catch (err) {
       console.error(err);
     }
   };
 
+  const handleCloseMessages = () => {
+    closeEvents();
+    setShowMessages(null);
+  };
+
   const handleSendMessage = async (e: React.FormEvent) => {
     e.preventDefault();
-    if (!messageText || !selectedCircle) return;
+    if (!messageText || !selectedCircle || !receiverId) return;
     try {
-      await sendCircleMessage(selectedCircle.id, {
-        receiver_id: selectedCircle.members?.[0]?.user_id || 1,
+      const res = await sendCircleMessage(selectedCircle.id, {
+        receiver_id: Number(receiverId),
         message: messageText
       });
       setMessageText('');
-      setMessages([]);
-      await handleViewMessages(selectedCircle);
+      addMessage(res.data);
     } catch (err: any) {
       console.error('Error sending message:', err);
       alert(err.response?.data?.detail || 'Failed to send message');
@@ -175,11 +206,11 @@ export default function Circles() {
 
       {/* Messages Modal */}
       {showMessages && (
-        <div className="modal-overlay" onClick={() => setShowMessages(null)}>
+        <div className="modal-overlay" onClick={handleCloseMessages}>
           <div className="modal" onClick={(e) => e.stopPropagation()}>
             <div className="modal-header">
               <h2>Messages - {selectedCircle?.name}</h2>
-              <button className="modal-close" onClick={() => setShowMessages(null)}>&times;</button>
+              <button className="modal-close" onClick={handleCloseMessages}>&times;</button>
             </div>
             
             <div style={{ maxHeight: '300px', overflowY: 'auto', marginBottom: '1rem' }}>
@@ -196,6 +227,24 @@ export default function Circles() {
             </div>
 
             <form onSubmit={handleSendMessage}>
+              <div className="form-group">
+                <select
+                  className="input"
+                  value={receiverId}
+                  onChange={(e) => setReceiverId(e.target.value)}
+                  disabled={recipients.length === 0}
+                  required
+                >
+                  <option value="">
+                    {recipients.length === 0 ? 'No other members to message' : 'Send to...'}
+                  </option>
+                  {recipients.map((m) => (
+                    <option key={m.user_id} value={m.user_id}>
+                      User {m.user_id}{m.role === 'OWNER' ? ' (owner)' : ''}
+                    </option>
+                  ))}
+                </select>
+              </div>
               <div className="form-group">
                 <textarea
                   className="input"
@@ -205,7 +254,7 @@ export default function Circles() {
                   rows={2}
                 />
               </div>
-              <button type="submit" className="btn btn-primary">Send</button>
+              <button type="submit" className="btn btn-primary" disabled={!receiverId}>Send</button>
             </form>
           </div>
         </div>
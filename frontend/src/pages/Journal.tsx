@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { createJournal, getJournals, deleteJournal } from '../api';
+import { createJournal, getJournalSummaries, deleteJournal } from '../api';
 
 export default function Journal() {
   const [content, setContent] = useState('');
@@ -14,7 +14,7 @@ export default function Journal() {
   const fetchEntries = async () => {
     setLoading(true);
     try {
-      const res = await getJournals({ page, limit: 10, search });
+      const res = await getJournalSummaries({ page, limit: 10, search });
       setEntries(res.data);
       setTotalPages(Math.ceil(res.headers['content-range']?.split('/')[1] || 10 / 10) || 1);
     } finally {
@@ -138,7 +138,7 @@ export default function Journal() {
                 <tr key={entry.id}>
                   <td>{new Date(entry.created_at).toLocaleDateString()}</td>
                   <td style={{ maxWidth: '300px', overflow: 'hidden', textOverflow: 'ellipsis' }}>
-                    {entry.content.substring(0, 100)}...
+                    {entry.excerpt}{entry.truncated && '...'}
                   </td>
                   <td className={getSentimentClass(entry.sentiment_score || 0)}>
                     {entry.sentiment_score?.toFixed(2) || '-'}
@@ -22,6 +22,17 @@ export interface JournalEntry {
   created_at: string;
 }
 
+export interface JournalSummary {
+  id: number;
+  user_id: number;
+  excerpt: string;
+  truncated: boolean;
+  sentiment_score: number | null;
+  emotion_label: string | null;
+  risk_flag: boolean;
+  created_at: string;
+}
+
 export interface Medication {
   id: number;
   user_id: number;